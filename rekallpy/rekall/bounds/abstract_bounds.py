@@ -11,7 +11,9 @@ class Bounds(ABC):
 
     Each class that inherits from ``Bounds`` should define a ``data`` dict upon
     initialization. This allows fields from the bounds to be referenced using
-    ``[]`` notation.
+    ``[]`` notation. Classes with a fixed set of fields may instead store them
+    in ``__slots__``, override ``__getitem__`` and ``__setitem__``, and expose
+    ``data`` as a read-only property.
 
     Each child class should also implement the following methods:
     
@@ -97,6 +99,7 @@ class Bounds(ABC):
     Attributes:
         data: dict mapping from co-ordinate keys to co-ordinate values
     """
+    __slots__ = ()
 
     def __getitem__(self, arg):
         """Get ``arg`` from ``self.data``."""
@@ -151,16 +154,20 @@ class Bounds(ABC):
             A function that transforms a predicate function by remapping
             key-value lookups in the predicate function's arguments.
         """
+        # Identity re-mappings don't change any lookups.
+        schema = {k: v for k, v in schema.items() if k != v}
+        if not schema:
+            return lambda pred: pred
+
         class WrappedArg:
+            __slots__ = ('orig_obj', 'schema')
+
             def __init__(self, orig_obj, schema):
                 self.orig_obj = orig_obj
                 self.schema = schema
 
             def __getitem__(self, arg):
-                if arg in self.schema:
-                    return self.orig_obj[self.schema[arg]]
-                else:
-                    return self.orig_obj[arg]
+                return self.orig_obj[self.schema.get(arg, arg)]
 
         def wrap_pred(pred):
             def new_pred(*args):
@@ -193,6 +200,15 @@ class Bounds(ABC):
         """Method to compare two Bounds. Child classes should implement
         this."""
 
+    def sort_key(self):
+        """Returns a key that orders Bounds the same way as ``__lt__``.
+
+        Sorting by key computes the key once per Bound instead of calling
+        ``__lt__`` for every comparison. Defaults to the Bound itself; child
+        classes can return a tuple of their co-ordinates instead.
+        """
+        return self
+
     @abstractmethod
     def __repr__(self):
         """Method to get a string representation of a Bound. Child classes
@@ -10,6 +10,8 @@ class Bounds1D(Bounds):
     in a temporal dimension, respectively.
     This class has no built-in casts, since there's only one dimension.
     """
+    __slots__ = ('data',)
+
     def __init__(self, t1, t2):
         """Initialize this Bounds1D object by explicitly passing in values for
         't1' and 't2'.
@@ -26,6 +28,13 @@ class Bounds1D(Bounds):
             't2': t2
         }
 
+    # Same state as the instance dict that older versions pickled
+    def __getstate__(self):
+        return {'data': self.data}
+
+    def __setstate__(self, state):
+        self.data = state['data']
+
     @classmethod
     def fromTuple(cls, t1t2_tuple):
         """Create a Bounds1D object with a tuple of length two.
@@ -46,6 +55,10 @@ class Bounds1D(Bounds):
         """Ordering of a Bounds1D is by 't1' first and then 't2'."""
         return (self['t1'], self['t2']) < (other['t1'], other['t2'])
 
+    def sort_key(self):
+        """Key is the tuple ('t1', 't2')."""
+        return (self['t1'], self['t2'])
+
     def __repr__(self):
         """String representation is ``'t1:val t2:val'``."""
         return 't1:{} t2:{}'.format(self['t1'], self['t2'])
@@ -73,13 +86,10 @@ class Bounds1D(Bounds):
             A single Bounds1D covering the intersection of ``self`` and
             ``other``, or ``None`` if the two bounds do not overlap.
         """
-        if overlaps()(self, other):
-            return Bounds1D.fromTuple(utils.bounds_intersect(
-                (self['t1'], self['t2']), 
-                (other['t1'], other['t2'])
-            ))
-        else:
+        if not overlaps()(self, other):
             return None
+        return Bounds1D(max(self['t1'], other['t1']),
+                        min(self['t2'], other['t2']))
 
     def copy(self):
         """Returns a copy of this bound."""
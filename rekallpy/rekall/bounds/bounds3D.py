@@ -1,7 +1,21 @@
 """This module defines and implements the Bounds3D three-dimensional bound."""
 
-from rekall.bounds import Bounds, utils
-from rekall.predicates import overlaps
+from types import MappingProxyType
+
+from rekall.bounds import Bounds
+from rekall.predicates import overlaps, _ranges_overlap
+
+
+def _overlaps_on(key1, key2):
+    """``overlaps()`` cast to the co-ordinates ``key1`` and ``key2``, reading
+    them directly instead of through cast wrappers."""
+    def fn(intrvl1, intrvl2):
+        return _ranges_overlap(intrvl1[key1], intrvl1[key2],
+                               intrvl2[key1], intrvl2[key2])
+    return fn
+
+_X_OVERLAPS = _overlaps_on('x1', 'x2')
+_Y_OVERLAPS = _overlaps_on('y1', 'y2')
 
 
 class Bounds3D(Bounds):
@@ -13,7 +27,13 @@ class Bounds3D(Bounds):
     This class has two built-in one-dimensional casts - ``X()`` and ``Y()``
     cast the time dimensions to the x and y dimensions so that temporal
     predicates can be used on one-dimensional spatial dimensions.
+
+    The co-ordinates are stored in slots rather than in a ``data`` dict, which
+    saves memory and makes key access cheaper. ``data`` is still available as
+    a read-only mapping of the co-ordinates; use item assignment, such as
+    ``bounds['t1'] = 0``, to change them.
     """
+    __slots__ = ('t1', 't2', 'x1', 'x2', 'y1', 'y2')
 
     def __init__(self, t1, t2, x1=0., x2=1., y1=0., y2=1.):
         """Initialize this Bounds3D object by manually passing in all six
@@ -31,15 +51,56 @@ class Bounds3D(Bounds):
             A Bounds3D object with the six co-ordinates specified by the
             arguments.
         """
-        self.data = {
-            't1': t1,
-            't2': t2,
-            'x1': x1,
-            'x2': x2,
-            'y1': y1,
-            'y2': y2
+        self.t1 = t1
+        self.t2 = t2
+        self.x1 = x1
+        self.x2 = x2
+        self.y1 = y1
+        self.y2 = y2
+
+    def __getitem__(self, arg):
+        """Get co-ordinate ``arg``."""
+        if arg not in _COORDS:
+            raise KeyError(arg)
+        return getattr(self, arg)
+
+    def __setitem__(self, key, item):
+        """Set co-ordinate ``key`` to ``item``."""
+        if key not in _COORDS:
+            raise KeyError(key)
+        setattr(self, key, item)
+
+    # Compact pickled state
+    def __getstate__(self):
+        return (self.t1, self.t2, self.x1, self.x2, self.y1, self.y2)
+
+    def __setstate__(self, state):
+        # Older versions pickled the instance dict, which held a data dict.
+        if isinstance(state, dict):
+            data = state['data']
+            state = (data['t1'], data['t2'], data['x1'], data['x2'],
+                     data['y1'], data['y2'])
+        self.t1, self.t2, self.x1, self.x2, self.y1, self.y2 = state
+
+    @property
+    def data(self):
+        """Read-only mapping from co-ordinate keys to co-ordinate values."""
+        return MappingProxyType(self._to_dict())
+
+    def _to_dict(self):
+        return {
+            't1': self.t1,
+            't2': self.t2,
+            'x1': self.x1,
+            'x2': self.x2,
+            'y1': self.y1,
+            'y2': self.y2
         }
 
+    def to_json(self):
+        """Converts the bounds to a JSON object."""
+        return self._to_dict()
+
     @classmethod
     def fromTuple(cls, tuple_3d):
         """Initialize a Bounds3D object with a tuple of length two or six.
@@ -58,9 +119,13 @@ class Bounds3D(Bounds):
 
     def __lt__(self, other):
         """Ordering is by 't1', 't2', 'x1', 'x2', 'y1', 'y2'."""
-        return (self['t1'], self['t2'], self['x1'], self['x2'], self['y1'],
-                self['y2']) < (other['t1'], other['t2'], other['x1'],
-                               other['x2'], other['y1'], other['y2'])
+        return (self.t1, self.t2, self.x1, self.x2, self.y1,
+                self.y2) < (other['t1'], other['t2'], other['x1'],
+                            other['x2'], other['y1'], other['y2'])
+
+    def sort_key(self):
+        """Key is the tuple ('t1', 't2', 'x1', 'x2', 'y1', 'y2')."""
+        return (self.t1, self.t2, self.x1, self.x2, self.y1, self.y2)
 
     def __repr__(self):
         """String representation is
@@ -75,8 +140,7 @@ class Bounds3D(Bounds):
 
     def copy(self):
         """Returns a copy of this bound."""
-        return Bounds3D(self['t1'], self['t2'], self['x1'], self['x2'],
-                        self['y1'], self['y2'])
+        return Bounds3D(self.t1, self.t2, self.x1, self.x2, self.y1, self.y2)
 
     def T(pred):
         """Returns a function that transforms predicates by casting accesses to
@@ -89,7 +153,7 @@ class Bounds3D(Bounds):
         Returns:
             The same predicate as ``pred``.
         """
-        return Bounds.cast({'t1': 't1', 't2': 't2'})(pred)
+        return pred
 
     def X(pred):
         """Returns a function that transforms predicates by casting accesses to
@@ -117,6 +181,8 @@ class Bounds3D(Bounds):
             The same predicate as ``pred``, except accesses to 't1' are cast to
             'x1', and accesses to 't2' are cast to 'x2'.
         """
+        if pred is overlaps():
+            return _X_OVERLAPS
         return Bounds.cast({'t1': 'x1', 't2': 'x2'})(pred)
 
     def Y(pred):
@@ -145,6 +211,8 @@ class Bounds3D(Bounds):
             The same predicate as ``pred``, except accesses to 't1' are cast to
             'y1', and accesses to 't2' are cast to 'y2'.
         """
+        if pred is overlaps():
+            return _Y_OVERLAPS
         return Bounds.cast({'t1': 'y1', 't2': 'y2'})(pred)
 
     def XY(pred):
@@ -159,12 +227,7 @@ class Bounds3D(Bounds):
         Returns:
             The same predicate as ``pred``.
         """
-        return Bounds.cast({
-            'x1': 'x1',
-            'x2': 'x2',
-            'y1': 'y1',
-            'y2': 'y2'
-        })(pred)
+        return pred
 
     def combine_per_axis(self, other, t_combiner, x_combiner, y_combiner):
         """Combines two Bounds using a one-dimensional Combiner function for
@@ -200,8 +263,9 @@ class Bounds3D(Bounds):
         Returns:
             A single Bounds3D spanning ``self`` and ``other``.
         """
-        return self.combine_per_axis(other, utils.bounds_span,
-                                     utils.bounds_span, utils.bounds_span)
+        return Bounds3D(min(self.t1, other['t1']), max(self.t2, other['t2']),
+                        min(self.x1, other['x1']), max(self.x2, other['x2']),
+                        min(self.y1, other['y1']), max(self.y2, other['y2']))
 
     def intersect_time_span_space(self, other):
         """Returns the bound intersecting ``other`` in time and spanning
@@ -213,11 +277,11 @@ class Bounds3D(Bounds):
             time but spanning them in space, or ``None`` if they do not
             overlap in time.
         """
-        if overlaps()(self, other):
-            return self.combine_per_axis(other, utils.bounds_intersect,
-                                         utils.bounds_span, utils.bounds_span)
-        else:
+        if not overlaps()(self, other):
             return None
+        return Bounds3D(max(self.t1, other['t1']), min(self.t2, other['t2']),
+                        min(self.x1, other['x1']), max(self.x2, other['x2']),
+                        min(self.y1, other['y1']), max(self.y2, other['y2']))
 
     def expand_to_frame(self):
         """Returns a bound with the same time extent but with full spatial
@@ -229,15 +293,15 @@ class Bounds3D(Bounds):
 
     def length(self):
         """Returns the length of the time interval."""
-        return utils.bound_size((self['t1'], self['t2']))
+        return self.t2 - self.t1
 
     def width(self):
         """Returns the width (X dimension) of the time interval."""
-        return utils.bound_size((self['x1'], self['x2']))
+        return self.x2 - self.x1
 
     def height(self):
         """Returns the height (Y dimension) of the time interval."""
-        return utils.bound_size((self['y1'], self['y2']))
+        return self.y2 - self.y1
 
     def T_axis():
         """Returns a tuple representing the time axis."""
@@ -250,3 +314,5 @@ class Bounds3D(Bounds):
     def Y_axis():
         """Returns a tuple representing the Y axis."""
         return ('y1', 'y2')
+
+_COORDS = frozenset(Bounds3D.__slots__)
@@ -5,6 +5,7 @@ Attributes:
 """
 import sys
 from contextlib import contextmanager
+from time import perf_counter
 
 INFTY = "infty"
 
@@ -0,0 +1,189 @@
+"""This module defines indexes over the intervals in an IntervalSet.
+
+An index is built once over a static, sorted list of intervals and answers
+overlap queries along a single axis without scanning the whole list. When all
+the queries are known up front and sorted, a single sweep over both lists
+finds the overlaps without building an index.
+"""
+
+
+class IntervalTree:
+    """A static interval tree over one axis of a sorted list of intervals.
+
+    The tree is implicit: it is laid out in flat lists in the same order as
+    the intervals, with an internal node at every index whose lowest ``k``
+    bits are set (for a node on level ``k``). Each node is augmented with the
+    maximum end point in its subtree, so that a query can skip any subtree
+    that ends before the query starts. This is the layout used by cgranges
+    and COITrees; it needs no pointers and can be built in linear time.
+
+    Queries report intervals whose closed range ``[start, end]`` intersects
+    the closed query range ``[lo, hi]``, in the order of the original list.
+
+    Example:
+        Here is an example of querying the tree::
+
+            tree = IntervalTree([0, 2, 5], [1, 6, 7])
+
+            # Intervals 1 and 2 intersect [5.5, 10]
+            tree.query(5.5, 10) == [1, 2]
+    """
+
+    # Subtrees at or below this level are scanned linearly.
+    _SCAN_LEVEL = 3
+
+    def __init__(self, starts, ends):
+        """Builds the tree over the intervals ``[starts[i], ends[i]]``.
+
+        Args:
+            starts: A list of start co-ordinates, sorted in ascending order.
+            ends: A list of end co-ordinates, of the same length as
+                ``starts``.
+        """
+        self._starts = list(starts)
+        self._ends = list(ends)
+        self._max_ends = list(ends)
+        self._max_level = self._build()
+
+    def __len__(self):
+        """Number of intervals in the tree."""
+        return len(self._starts)
+
+    def _build(self):
+        """Computes the max end of every subtree bottom-up and returns the
+        level of the root."""
+        n = len(self._starts)
+        if n == 0:
+            return -1
+        max_ends = self._max_ends
+        # `last` is the max end of the rightmost node at the current level,
+        # used in place of right children that fall past the end of the list.
+        last_i = (n - 1) & ~1
+        last = max_ends[last_i]
+        k = 1
+        while (1 << k) <= n:
+            x = 1 << (k - 1)
+            for i in range((1 << k) - 1, n, x << 2):
+                e = max_ends[i]
+                el = max_ends[i - x]
+                er = max_ends[i + x] if i + x < n else last
+                if el > e:
+                    e = el
+                if er > e:
+                    e = er
+                max_ends[i] = e
+            last_i = last_i - x if (last_i >> k) & 1 else last_i + x
+            if last_i < n and max_ends[last_i] > last:
+                last = max_ends[last_i]
+            k += 1
+        return k - 1
+
+    def query(self, lo, hi):
+        """Finds all intervals intersecting the closed range ``[lo, hi]``.
+
+        Args:
+            lo: Start of the query range.
+            hi: End of the query range.
+
+        Returns:
+            A list of indices ``i``, in ascending order, of the intervals with
+            ``starts[i] <= hi`` and ``ends[i] >= lo``.
+        """
+        return list(self.iter_query(lo, hi))
+
+    def iter_query(self, lo, hi):
+        """Lazily finds the intervals intersecting the closed range
+        ``[lo, hi]``.
+
+        Same as ``query``, but walks the tree only as far as the caller
+        consumes the results, so a search for any match can stop at the
+        first one.
+
+        Args:
+            lo: Start of the query range.
+            hi: End of the query range.
+
+        Yields:
+            The indices ``i``, in ascending order, of the intervals with
+            ``starts[i] <= hi`` and ``ends[i] >= lo``.
+        """
+        starts = self._starts
+        ends = self._ends
+        max_ends = self._max_ends
+        n = len(starts)
+        if n == 0:
+            return
+        # Each stack entry is (level, node, left_done).
+        root = self._max_level
+        stack = [(root, (1 << root) - 1, False)]
+        while stack:
+            k, x, left_done = stack.pop()
+            if k <= IntervalTree._SCAN_LEVEL:
+                i = x >> k << k
+                i1 = min(i + (1 << (k + 1)) - 1, n)
+                while i < i1 and starts[i] <= hi:
+                    if ends[i] >= lo:
+                        yield i
+                    i += 1
+            elif not left_done:
+                stack.append((k, x, True))
+                y = x - (1 << (k - 1))
+                if y >= n or max_ends[y] >= lo:
+                    stack.append((k - 1, y, False))
+            elif x < n and starts[x] <= hi:
+                if ends[x] >= lo:
+                    yield x
+                stack.append((k - 1, x + (1 << (k - 1)), False))
+
+
+def sweep_overlaps(query_starts, query_ends, starts, ends, window=0):
+    """Finds the overlapping intervals for a sorted batch of queries.
+
+    This is a forward-scan plane sweep: both lists are walked once in order of
+    their start co-ordinates, and whenever an interval starts it scans ahead
+    over the other list for intervals that start before it ends. When all
+    intervals have ``start <= end``, every item scanned is a match, so the
+    sweep runs in time linear in the sizes of the inputs and the output,
+    without building an index. Inverted intervals, such as those produced by
+    dilating with a negative window, are still matched exactly.
+
+    Both ``query_starts`` and ``starts`` must be sorted in ascending order.
+
+    Args:
+        query_starts: A list of start co-ordinates of the query ranges.
+        query_ends: A list of end co-ordinates of the query ranges.
+        starts: A list of start co-ordinates of the intervals to search.
+        ends: A list of end co-ordinates of the intervals to search.
+        window (optional): Widen each query range by this amount on both
+            sides. Defaults to 0.
+
+    Yields:
+        For each query range ``[lo, hi]`` in order, a list of indices ``i``,
+        in ascending order, of the intervals with ``starts[i] <= hi`` and
+        ``ends[i] >= lo``.
+    """
+    n = len(query_starts)
+    m = len(starts)
+    # found[k] collects matches for query k from intervals that start
+    # before the query does.
+    found = [[] for _ in range(n)]
+    j = 0
+    for i in range(n):
+        lo = query_starts[i] - window
+        while j < m and starts[j] < lo:
+            reach = ends[j] + window
+            k = i
+            while k < n and query_starts[k] <= reach:
+                if starts[j] <= query_ends[k] + window:
+                    found[k].append(j)
+                k += 1
+            j += 1
+        out = found[i]
+        found[i] = None
+        hi = query_ends[i] + window
+        k = j
+        while k < m and starts[k] <= hi:
+            if ends[k] >= lo:
+                out.append(k)
+            k += 1
+        yield out
@@ -1,6 +1,8 @@
 """An Interval is a wrapper around a Bounds instance with a payload.
 """
 
+from rekall.stdlib.merge_ops import payload_first
+
 
 class Interval:
     """A single Interval.
@@ -14,6 +16,7 @@ class Interval:
         bounds: Bounds object.
         payload: payload object.
     """
+    __slots__ = ('bounds', 'payload')
 
     def __init__(self, bounds, payload=None):
         """Initializes an interval with certain bounds and payload.
@@ -25,6 +28,16 @@ class Interval:
         self.bounds = bounds
         self.payload = payload
 
+    # Compact pickled state
+    def __getstate__(self):
+        return (self.bounds, self.payload)
+
+    def __setstate__(self, state):
+        # Older versions pickled the instance dict.
+        if isinstance(state, dict):
+            state = (state['bounds'], state['payload'])
+        self.bounds, self.payload = state
+
     def __getitem__(self, arg):
         """Access bounds, payload, or a co-ordinate of bounds using key access.
 
@@ -55,7 +68,7 @@ class Interval:
         return "<Interval {} payload:{}>".format(self.bounds, self.payload)
 
     def __lt__(self, other):
-        return self['bounds'] < other['bounds']
+        return self.bounds < other.bounds
 
     def copy(self):
         """Returns a copy of the Interval."""
@@ -64,7 +77,7 @@ class Interval:
     def combine(self,
                 other,
                 bounds_combiner,
-                payload_combiner=lambda p1, p2: p1):
+                payload_combiner=payload_first):
         """Combines two Intervals into one by separately combining the bounds
         and the payload.
 
@@ -79,8 +92,11 @@ class Interval:
             A new Interval combined using ``bounds_combiner`` and
             ``payload_combiner``.
         """
-        return Interval(bounds_combiner(self.bounds, other.bounds),
-                        payload_combiner(self.payload, other.payload))
+        if payload_combiner is payload_first:
+            payload = self.payload
+        else:
+            payload = payload_combiner(self.payload, other.payload)
+        return Interval(bounds_combiner(self.bounds, other.bounds), payload)
 
     def P(pred):
         """This wraps a predicate so it is applied to the payload of Intervals
@@ -2,15 +2,41 @@
 transform and combine sets of Intervals.
 """
 
-from rekall.bounds import Bounds
+from rekall.bounds import Bounds3D
 from rekall.interval import Interval
 from rekall.helpers import INFTY
+from rekall.index import IntervalTree, sweep_overlaps
 from rekall.predicates import *
+from rekall.predicates import _ranges_overlap
+from rekall.stdlib.merge_ops import payload_first
+from bisect import bisect_right
 from functools import reduce
+from itertools import accumulate, compress
 import constraint as constraint
 import copy
 
 
+_BOUNDS3D_KEYS = ('t1', 't2', 'x1', 'x2', 'y1', 'y2')
+_BOUNDS3D_STARTS = ('t1', 'x1', 'y1')
+_BOUNDS3D_ENDS = ('t2', 'x2', 'y2')
+
+def _interval_sort_key(intrvl):
+    return intrvl.bounds.sort_key()
+
+
+def _overlaps_or_before(start1, end1, start2, end2, epsilon):
+    """Whether the range ``[start1, end1]`` overlaps ``[start2, end2]`` or
+    ends at most ``epsilon`` before it starts.
+
+    Same as ``or_pred(overlaps(), before(max_dist=epsilon))`` on the two
+    ranges, but takes the co-ordinates directly.
+    """
+    if _ranges_overlap(start1, end1, start2, end2):
+        return True
+    time_diff = start2 - end1
+    return time_diff >= 0 and (epsilon == INFTY or time_diff <= epsilon)
+
+
 class IntervalSet:
     """A set of Intervals.
 
@@ -20,6 +46,10 @@ class IntervalSet:
     Note:
         This class does not obey the uniqueness semantics of a Set.
 
+        Intervals in an IntervalSet should be treated as immutable. Operations
+        that keep an interval unchanged, such as ``filter``, share it with the
+        output set instead of copying it.
+
         When the number of intervals is larger than NUM_INTRVLS_THRESHOLD,
         binary operations `join`, `collect_by_interval` and `filter_against`
         will no longer operate on the full cross product of the intervals, and
@@ -38,6 +68,9 @@ class IntervalSet:
     """
     NUM_INTRVLS_THRESHOLD = 1000
     DEFAULT_FRACTION = 1 / 100
+    # Probe other's interval tree instead of sweeping both sets when other
+    # has more than this many intervals per interval in self.
+    _SWEEP_RATIO = 32
 
     def __init__(self, intrvls):
         """Initializes IntervalSet with a list of Intervals.
@@ -45,11 +78,50 @@ class IntervalSet:
         Args:
             intrvls: a list of Intervals to put in the set.
         """
-        self._intrvls = sorted(list(intrvls))
+        self._set_sorted_intervals(sorted(intrvls, key=_interval_sort_key))
+
+    @classmethod
+    def _from_sorted(cls, intrvls):
+        """Internal constructor for a list of Intervals that is already in
+        sorted order, such as a subsequence of another set's intervals.
+
+        Skips the sort in ``__init__``.
+        """
+        new_set = cls.__new__(cls)
+        new_set._set_sorted_intervals(intrvls)
+        return new_set
+
+    @classmethod
+    def _from_unsorted(cls, intrvls):
+        """Internal constructor for a freshly built list of Intervals that no
+        one else holds a reference to.
+
+        Sorts the list in place instead of sorting a copy of it.
+        """
+        intrvls.sort(key=_interval_sort_key)
+        return cls._from_sorted(intrvls)
+
+    def _set_sorted_intervals(self, intrvls):
+        self._intrvls = intrvls
         self._primary_axis = None
         if len(self._intrvls) > 0:
             self._primary_axis = self._intrvls[0]['bounds'].primary_axis()
-        self._optimization_window = self._get_optimization_window()
+        self._columns = {}
+        # Computed on first use, since most sets never take part in a binary
+        # operation that needs it.
+        self._optimization_window = None
+        self._index = None
+
+    # The cached columns, index and window are rebuilt on demand, so they are
+    # left out of the pickled state.
+    def __getstate__(self):
+        return self._intrvls
+
+    def __setstate__(self, intrvls):
+        # Older versions pickled the instance dict.
+        if isinstance(intrvls, dict):
+            intrvls = intrvls['_intrvls']
+        self._set_sorted_intervals(intrvls)
 
     def __repr__(self):
         """String representation is a list of Intervals."""
@@ -61,10 +133,15 @@ class IntervalSet:
 
     # Compute the default optimization_window based on the current intervals
     def _get_optimization_window(self):
+        if self._optimization_window is None:
+            self._optimization_window = self._compute_optimization_window()
+        return self._optimization_window
+
+    def _compute_optimization_window(self):
         n = len(self._intrvls)
         if n > 0:
-            max_end = max([i[self._primary_axis[1]] for i in self._intrvls])
-            min_start = min([i[self._primary_axis[0]] for i in self._intrvls])
+            max_end = max(self._get_column(self._primary_axis[1]))
+            min_start = min(self._get_column(self._primary_axis[0]))
             if n > IntervalSet.NUM_INTRVLS_THRESHOLD:
                 return (max_end - min_start) * IntervalSet.DEFAULT_FRACTION
             else:
@@ -72,6 +149,34 @@ class IntervalSet:
         else:
             return 0
 
+    # Lazily extract the values of one co-ordinate of all the intervals, in
+    # the same order as the intervals. Scans over a co-ordinate read these
+    # flat lists instead of going through each Interval and its Bounds.
+    def _get_column(self, key):
+        column = self._columns.get(key)
+        if column is None:
+            column = [i.bounds[key] for i in self._intrvls]
+            self._columns[key] = column
+        return column
+
+    # Columns of the subset of intervals picked out by selectors, for sets
+    # derived from this one whose intervals keep their co-ordinates.
+    def _compress_columns(self, selectors):
+        return {key: list(compress(column, selectors))
+                for key, column in self._columns.items()}
+
+    # Lazily build the index over the primary axis used by binary operations.
+    # The intervals in the set are never mutated, so the index stays valid.
+    def _get_index(self):
+        if self._index is None:
+            pa = self._primary_axis
+            if pa is None:
+                self._index = IntervalTree([], [])
+            else:
+                self._index = IntervalTree(self._get_column(pa[0]),
+                                           self._get_column(pa[1]))
+        return self._index
+
     def get_intervals(self):
         """Returns a list of Intervals, ordered by their Bounds (which are
         sortable).
@@ -93,11 +198,14 @@ class IntervalSet:
         """
         if axis is None:
             axis = self._primary_axis
-        return self.fold(lambda total, intrvl: total + intrvl.size(axis), 0)
+        if self.empty():
+            return 0
+        return sum(end - start for start, end in zip(
+            self._get_column(axis[0]), self._get_column(axis[1])))
 
     def empty(self):
         """Returns whether the set is empty."""
-        return self.size() == 0
+        return not self._intrvls
 
     def map(self, map_fn):
         """Maps a function over all intervals in the set.
@@ -108,7 +216,7 @@ class IntervalSet:
         Returns:
             A new IntervalSet with the mapped intervals.
         """
-        return IntervalSet([map_fn(intrvl) for intrvl in self._intrvls])
+        return IntervalSet(map_fn(intrvl) for intrvl in self._intrvls)
 
     def split(self, split_fn):
         """Splits each Interval into an IntervalSet, and returns the union of
@@ -122,8 +230,8 @@ class IntervalSet:
             A new IntervalSet with the union of all the IntervalSets generated
             by split_fn applied to each Interval.
         """
-        lists = [split_fn(intrvl).get_intervals() for intrvl in self._intrvls]
-        return IntervalSet([i for l in lists for i in l])
+        return IntervalSet(i for intrvl in self._intrvls
+                           for i in split_fn(intrvl).get_intervals())
 
     def union(self, other):
         """Set union of two IntervalSets.
@@ -134,7 +242,23 @@ class IntervalSet:
         Returns:
             A new IntervalSet with all intervals in self and other.
         """
-        return IntervalSet(self._intrvls + other._intrvls)
+        # Both sides are already sorted, so merge them instead of re-sorting.
+        # Ties go to self, like a stable sort of the concatenation would.
+        left = self._intrvls
+        right = other._intrvls
+        merged = []
+        i = 0
+        j = 0
+        while i < len(left) and j < len(right):
+            if right[j] < left[i]:
+                merged.append(right[j])
+                j += 1
+            else:
+                merged.append(left[i])
+                i += 1
+        merged.extend(left[i:])
+        merged.extend(right[j:])
+        return IntervalSet._from_sorted(merged)
 
     def fold(self, reducer, init=None, sort_key=None):
         """Folds a reducer over an ordered list of intervals in the set.
@@ -220,40 +344,80 @@ class IntervalSet:
         Returns:
             A flattened list of mapper outputs.
         """
+        other_intrvls = other.get_intervals()
+        outputs = []
+        for intrvlself, indices in zip(self._intrvls,
+                self._match_within_primary_axis_window(other, window)):
+            intervals_in_other = [other_intrvls[i] for i in indices]
+            outputs.extend(mapper(intrvlself, intervals_in_other))
+        return outputs
+
+    def _match_within_primary_axis_window(self, other, window=None,
+                                          lazy=False):
+        """Internal helper to find the intervals in other that are within
+        window of each interval in self along each's primary axis.
+
+        The intervals in other are found with a single sweep over both sets
+        in order of their primary axis. If self is much smaller than other,
+        they are instead looked up with an interval tree over the primary
+        axis of other, which is built once and cached on other.
+
+        If ``lazy`` is True, the tree lookups yield their indices as they are
+        consumed, so callers that only need the first match can stop early.
+
+        Returns:
+            An iterable with an iterable of indices into
+            ``other.get_intervals()`` for each interval in self, in order.
+            The inner iterables are lists unless ``lazy`` is True.
+        """
         if window is None:
-            window = self._optimization_window
-
-        self_pa = self._primary_axis
-        other_pa = other._primary_axis
-
-        # State is (other_start_index, outputs, done_flag)
-        def update_state(state, intrvlself):
-            start_index, outputs, done = state
-            intervals_in_other = []
-            if not done:
-                new_start_index = None
-                for idx, intrvlother in enumerate(
-                        other.get_intervals()[start_index:]):
-                    self_start = intrvlself[self_pa[0]]
-                    self_end = intrvlself[self_pa[1]]
-                    other_start = intrvlother[other_pa[0]]
-                    other_end = intrvlother[other_pa[1]]
-                    if self_start - window <= other_end:
-                        if new_start_index is None:
-                            new_start_index = idx + start_index
-                        if other_start - window > self_end:
-                            break
-                        intervals_in_other.append(intrvlother)
-                if new_start_index is None:
-                    done = True
-                else:
-                    start_index = new_start_index
-            outputs.append(mapper(intrvlself, intervals_in_other))
-            return start_index, outputs, done
+            window = self._get_optimization_window()
 
-        state = (0, [], False)
-        _, outputs, _ = self.fold(update_state, state)
-        return [r for results in outputs for r in results]
+        if self.empty():
+            return []
+        self_starts = self._get_column(self._primary_axis[0])
+        self_ends = self._get_column(self._primary_axis[1])
+
+        if len(self._intrvls) * IntervalSet._SWEEP_RATIO < other.size():
+            index = other._get_index()
+            query = index.iter_query if lazy else index.query
+            return (query(start - window, end + window)
+                    for start, end in zip(self_starts, self_ends))
+        if other.empty():
+            return ([] for _ in self._intrvls)
+        return sweep_overlaps(
+            self_starts, self_ends,
+            other._get_column(other._primary_axis[0]),
+            other._get_column(other._primary_axis[1]), window)
+
+    def _has_match_within_primary_axis_window(self, other, window=None):
+        """Internal helper to find which intervals in self have at least one
+        interval in other within window along each's primary axis.
+
+        Since other is sorted by start, the intervals in other that start no
+        later than an interval in self ends form a prefix of other. Some of
+        them is within the window exactly when the largest end in that
+        prefix reaches the start of the interval in self, so one binary
+        search per interval answers the question without listing matches.
+
+        Returns:
+            A list with a bool for each interval in self, in order.
+        """
+        if window is None:
+            window = self._get_optimization_window()
+
+        if self.empty() or other.empty():
+            return [False] * len(self._intrvls)
+        other_starts = other._get_column(other._primary_axis[0])
+        prefix_max_ends = list(accumulate(
+            other._get_column(other._primary_axis[1]), max))
+        has_match = []
+        for start, end in zip(self._get_column(self._primary_axis[0]),
+                              self._get_column(self._primary_axis[1])):
+            n = bisect_right(other_starts, end + window)
+            has_match.append(n > 0 and
+                             prefix_max_ends[n - 1] >= start - window)
+        return has_match
 
     def join(self, other, predicate, merge_op, window=None):
         """Cross-products two sets and combines pairs that pass the predicate.
@@ -284,6 +448,34 @@ class IntervalSet:
             pairs that pass the predicate.
         """
 
+        if (predicate is overlaps() and not self.empty() and
+                not other.empty() and
+                self._primary_axis == other._primary_axis == ('t1', 't2')):
+            # Test temporal overlap directly on the co-ordinate columns.
+            self_starts = self._get_column('t1')
+            self_ends = self._get_column('t2')
+            other_intrvls = other.get_intervals()
+            other_starts = other._get_column('t1')
+            other_ends = other._get_column('t2')
+            out = []
+            for intrvlself, start, end, indices in zip(
+                    self._intrvls, self_starts, self_ends,
+                    self._match_within_primary_axis_window(other, window)):
+                for i in indices:
+                    if _ranges_overlap(start, end,
+                            other_starts[i], other_ends[i]):
+                        out.append(merge_op(intrvlself, other_intrvls[i]))
+            return IntervalSet._from_unsorted(out)
+
+        if predicate is true_pred():
+            # Every pair within the window passes, so skip the predicate.
+            other_intrvls = other.get_intervals()
+            return IntervalSet._from_unsorted([
+                merge_op(intrvlself, other_intrvls[i])
+                for intrvlself, indices in zip(self._intrvls,
+                    self._match_within_primary_axis_window(other, window))
+                for i in indices])
+
         def map_output(intrvlself, intervals_in_other):
             out = []
             for intrvlother in intervals_in_other:
@@ -292,7 +484,7 @@ class IntervalSet:
                     out.append(new_intrvl)
             return out
 
-        return IntervalSet(
+        return IntervalSet._from_unsorted(
             self._map_with_other_within_primary_axis_window(
                 other, map_output, window))
 
@@ -303,10 +495,14 @@ class IntervalSet:
             predicate: A function that takes an Interval and returns a bool.
 
         Returns:
-            A new IntervalSet which is the filtered set.
+            A new IntervalSet which is the filtered set. If ``predicate`` is
+            ``true_pred()``, this is ``self``, since intervals in a set are
+            immutable.
         """
-        return IntervalSet([
-            intrvl.copy() for intrvl in self.get_intervals()
+        if predicate is true_pred():
+            return self
+        return IntervalSet._from_sorted([
+            intrvl for intrvl in self.get_intervals()
             if predicate(intrvl)
         ])
 
@@ -323,20 +519,24 @@ class IntervalSet:
             A new IntervalSet with the results of merge on each group.
         """
 
-        def add_to_group(group, i):
-            k = key(i)
-            if k not in group:
-                group[k] = [i]
-            else:
-                group[k].append(i)
-            return group
+        return self._group_by_keys(map(key, self._intrvls), merge)
 
-        groups = self.fold(add_to_group, {})
+    def _group_by_keys(self, keys, merge):
+        """Groups intervals by the matching item of ``keys`` and merges each
+        group. Groups keep the order of this set, so they are already sorted.
+        """
+        groups = {}
+        for k, intrvl in zip(keys, self._intrvls):
+            group = groups.get(k)
+            if group is None:
+                groups[k] = [intrvl]
+            else:
+                group.append(intrvl)
         output = [
-            merge(k, IntervalSet(intervals))
+            merge(k, IntervalSet._from_sorted(intervals))
             for k, intervals in groups.items()
         ]
-        return IntervalSet(output)
+        return IntervalSet._from_unsorted(output)
 
     def minus(self, other, axis=None, window=None, predicate=None):
         """Subtract one IntervalSet from the other across some axis.
@@ -395,74 +595,63 @@ class IntervalSet:
         """
         if axis is None:
             axis = self._primary_axis
+        if predicate is true_pred():
+            predicate = None
 
-        def compute_difference(intrvl, overlapped_intervals):
+        def compute_difference(intrvl, to_subtract):
             """Returns a list of intervals that are what is left of intrvl
-            after subtracting all overlapped_intervals.
+            after subtracting all ranges in to_subtract.
 
-            Expects overlapped_intervals to be sorted by (axis[0], axis[1]).
+            Expects to_subtract to be a list of (start, end) pairs along axis,
+            sorted by start.
             """
             start = intrvl[axis[0]]
-            overlapped_index = 0
+            end = intrvl[axis[1]]
+            gaps = []
+            # Sweep over the ranges, keeping `start` at the furthest end point
+            # covered so far. Each range starting after it leaves a gap.
+            for v1, v2 in to_subtract:
+                if v1 > start:
+                    gaps.append((start, min(v1, end)))
+                if v2 > start:
+                    start = v2
+                if start >= end:
+                    break
+            if end > start:
+                gaps.append((start, end))
+
             output = []
-            while start < intrvl[axis[1]]:
-                # Each iteration proposes an interval starting at `start`
-                # If no overlapped interval goes acoss `start`, then it is
-                # a valid start for an interval after the subtraction.
-                intervals_across_start = []
-                first_interval_after_start = None
-                new_overlapped_index = None
-                for idx, overlap in enumerate(
-                        overlapped_intervals[overlapped_index:]):
-                    v1 = overlap[axis[0]]
-                    v2 = overlap[axis[1]]
-                    if new_overlapped_index is None and v2 > start:
-                        new_overlapped_index = idx + overlapped_index
-                    if v1 <= start and v2 > start:
-                        intervals_across_start.append(overlap)
-                    elif v1 > start:
-                        # overlap is sorted by (axis[0], axis[1])
-                        first_interval_after_start = overlap
-                        break
-                if len(intervals_across_start) == 0:
-                    # start is valid, now finds an end point
-                    if first_interval_after_start is None:
-                        end = intrvl[axis[1]]
-                        new_start = end
-                    else:
-                        end = first_interval_after_start[axis[0]]
-                        new_start = first_interval_after_start[axis[1]]
-                    if end > start:
-                        new_bounds = intrvl['bounds'].copy()
-                        new_bounds[axis[0]] = start
-                        new_bounds[axis[1]] = end
-                        output.append(Interval(new_bounds, intrvl['payload']))
-                    start = new_start
-                else:
-                    # start is invalid, now propose another start
-                    start = max([i[axis[1]] for i in intervals_across_start])
-                if new_overlapped_index is not None:
-                    overlapped_index = new_overlapped_index
+            for gap_start, gap_end in gaps:
+                new_bounds = intrvl['bounds'].copy()
+                new_bounds[axis[0]] = gap_start
+                new_bounds[axis[1]] = gap_end
+                output.append(Interval(new_bounds, intrvl['payload']))
             return output
 
+        # Candidates come in the order of other, which is already sorted by
+        # start along its primary axis.
+        sorted_by_start = (axis is not None and
+                           tuple(axis) == other._primary_axis)
+
         def map_output(intrvl, overlapped):
+            start = intrvl[axis[0]]
+            end = intrvl[axis[1]]
             # Take only nontrivial overlaps
-            to_subtract = sorted([
-                i for i in overlapped
-                if (i.size(axis) > 0 and
-                Bounds.cast({
-                    't1': axis[0],
-                    't2': axis[1]
-                })(overlaps())(intrvl, i) and
-                (predicate is None or predicate(intrvl, i)))
-            ],
-                                 key=lambda i: (i[axis[0]], i[axis[1]]))
+            to_subtract = []
+            for i in overlapped:
+                v1 = i[axis[0]]
+                v2 = i[axis[1]]
+                if (v2 - v1 > 0 and _ranges_overlap(start, end, v1, v2) and
+                        (predicate is None or predicate(intrvl, i))):
+                    to_subtract.append((v1, v2))
+            if not sorted_by_start:
+                to_subtract.sort()
             if len(to_subtract) == 0:
-                return [intrvl.copy()]
+                return [intrvl]
             else:
                 return compute_difference(intrvl, to_subtract)
 
-        return IntervalSet(
+        return IntervalSet._from_unsorted(
             self._map_with_other_within_primary_axis_window(
                 other, map_output, window))
 
@@ -607,13 +796,37 @@ class IntervalSet:
             with at least one interval in other.
         """
 
+        # Only whether some interval in other matches is needed, so with no
+        # predicate to check the candidates are never listed, and otherwise
+        # they are consumed lazily and the search stops at the first hit.
+        if predicate is true_pred():
+            return IntervalSet._from_sorted(list(compress(
+                self._intrvls,
+                self._has_match_within_primary_axis_window(other, window))))
+
+        if (predicate is overlaps() and not self.empty() and
+                not other.empty() and
+                self._primary_axis == other._primary_axis == ('t1', 't2')):
+            # Test temporal overlap directly on the co-ordinate columns.
+            other_starts = other._get_column('t1')
+            other_ends = other._get_column('t2')
+            return IntervalSet._from_sorted([
+                intrvlself for intrvlself, start, end, indices in zip(
+                    self._intrvls, self._get_column('t1'),
+                    self._get_column('t2'),
+                    self._match_within_primary_axis_window(
+                        other, window, lazy=True))
+                if any(_ranges_overlap(start, end,
+                                       other_starts[i], other_ends[i])
+                       for i in indices)])
+
         def map_output(intrvlself, intrvlothers):
             for intrvlother in intrvlothers:
                 if predicate(intrvlself, intrvlother):
-                    return [intrvlself.copy()]
+                    return [intrvlself]
             return []
 
-        return IntervalSet(
+        return IntervalSet._from_sorted(
             self._map_with_other_within_primary_axis_window(
                 other, map_output, window))
 
@@ -629,10 +842,15 @@ class IntervalSet:
             transformed payloads.
         """
 
-        def map_fn(intrvl):
-            return Interval(intrvl['bounds'], fn(intrvl['payload']))
-
-        return self.map(map_fn)
+        # The bounds are unchanged, so the intervals stay in sorted order and
+        # the columns and index built over them can be shared.
+        mapped = IntervalSet._from_sorted([
+            Interval(intrvl['bounds'], fn(intrvl['payload']))
+            for intrvl in self._intrvls])
+        mapped._columns = dict(self._columns)
+        mapped._index = self._index
+        mapped._optimization_window = self._optimization_window
+        return mapped
 
     def dilate(self, window, axis=None):
         """Expand the range of every interval in the set along some axis.
@@ -646,8 +864,11 @@ class IntervalSet:
                 which uses the ``primary_axis`` of ``self``.
 
         Returns:
-            A new IntervalSet with the dilated intervals.
+            A new IntervalSet with the dilated intervals, or ``self`` if
+            ``window`` is 0.
         """
+        if window == 0:
+            return self
         if axis is None:
             axis = self._primary_axis
 
@@ -657,8 +878,30 @@ class IntervalSet:
             new_bounds[axis[1]] += window
             return new_bounds
 
-        return self.map(lambda intrvl: Interval(
-            dilate_bounds(intrvl['bounds'], window, axis), intrvl['payload']))
+        dilated = [Interval(dilate_bounds(intrvl['bounds'], window, axis),
+                            intrvl['payload']) for intrvl in self._intrvls]
+        if axis is not None and axis == self._primary_axis:
+            # Shifting every start and end along the primary axis by the same
+            # amount keeps the intervals in sorted order, and grows the extent
+            # of the set by 2*window.
+            dilated_set = IntervalSet._from_sorted(dilated)
+            # Shift the columns along the axis instead of reading them back
+            # out of the new bounds; the other co-ordinates are unchanged.
+            columns = dict(self._columns)
+            if axis[0] in columns:
+                columns[axis[0]] = [v - window for v in columns[axis[0]]]
+            if axis[1] in columns:
+                columns[axis[1]] = [v + window for v in columns[axis[1]]]
+            dilated_set._columns = columns
+            if self._optimization_window is not None and len(dilated) > 0:
+                if len(dilated) > IntervalSet.NUM_INTRVLS_THRESHOLD:
+                    growth = 2 * window * IntervalSet.DEFAULT_FRACTION
+                else:
+                    growth = 2 * window
+                dilated_set._optimization_window = (
+                    self._optimization_window + growth)
+            return dilated_set
+        return IntervalSet._from_unsorted(dilated)
 
     def filter_size(self, min_size=0, max_size=INFTY, axis=None):
         """Filter the intervals by length of the bounds along some axis.
@@ -676,10 +919,22 @@ class IntervalSet:
             A new IntervalSet of intervals with bound length within
             [min_size, max_size] along the given axis.
         """
+        if self.empty():
+            return IntervalSet([])
         if axis is None:
             axis = self._primary_axis
-        return self.filter(lambda intrvl: intrvl.size(axis) >= min_size and (
-            max_size == INFTY or intrvl.size(axis) <= max_size))
+        sizes = (end - start for start, end in zip(
+            self._get_column(axis[0]), self._get_column(axis[1])))
+        if max_size == INFTY:
+            keep = [size >= min_size for size in sizes]
+        else:
+            keep = [min_size <= size <= max_size for size in sizes]
+        filtered = IntervalSet._from_sorted(
+            list(compress(self._intrvls, keep)))
+        # The kept intervals have the same co-ordinates, so the columns that
+        # are already built can be filtered along with them.
+        filtered._columns = self._compress_columns(keep)
+        return filtered
 
     def group_by_axis(self, axis, output_bounds):
         """Group intervals by a particular axis.
@@ -729,16 +984,16 @@ class IntervalSet:
             IntervalSet of Intervals in the group in the payload.
         """
 
-        def key_fn(intrvl):
-            return (intrvl[axis[0]], intrvl[axis[1]])
-
         def merge_fn(key, intervals):
             new_bounds = output_bounds.copy()
             new_bounds[axis[0]] = key[0]
             new_bounds[axis[1]] = key[1]
             return Interval(new_bounds, intervals)
 
-        return self.group_by(key_fn, merge_fn)
+        # Keys come straight from the co-ordinate columns.
+        return self._group_by_keys(
+            zip(self._get_column(axis[0]), self._get_column(axis[1])),
+            merge_fn)
 
     def collect_by_interval(self,
                             other,
@@ -778,24 +1033,29 @@ class IntervalSet:
             interval set from other in the payload.
         """
 
+        # The candidates from other come in sorted order, so any subsequence
+        # of them can be nested without sorting.
         def map_output(intrvlself, intrvlothers):
-            intrvls_to_nest = IntervalSet(
-                [i for i in intrvlothers if predicate(intrvlself, i)])
+            if predicate is true_pred():
+                intrvls_to_nest = IntervalSet._from_sorted(intrvlothers)
+            else:
+                intrvls_to_nest = IntervalSet._from_sorted(
+                    [i for i in intrvlothers if predicate(intrvlself, i)])
             if not intrvls_to_nest.empty() or not filter_empty:
                 return [
-                    Interval(intrvlself['bounds'].copy(),
+                    Interval(intrvlself['bounds'],
                              (intrvlself['payload'], intrvls_to_nest))
                 ]
             return []
 
-        return IntervalSet(
+        return IntervalSet._from_sorted(
             self._map_with_other_within_primary_axis_window(
                 other, map_output, window))
 
     def coalesce(self,
                  axis,
                  bounds_merge_op,
-                 payload_merge_op=lambda p1, p2: p1,
+                 payload_merge_op=payload_first,
                  predicate=None,
                  epsilon=0):
         """Recursively merge all intervals that are touching or overlapping
@@ -833,47 +1093,122 @@ class IntervalSet:
 
         new_coalesced_intrvls = []
 
+        # Sort along axis using the co-ordinate columns. The set is already
+        # sorted along its primary axis.
+        starts = self._get_column(axis[0])
+        ends = self._get_column(axis[1])
+        if tuple(axis) == self._primary_axis:
+            order = range(len(self._intrvls))
+        else:
+            keys = list(zip(starts, ends))
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+
+        if ((predicate is None or predicate is true_pred()) and
+                bounds_merge_op is Bounds3D.span and
+                axis[0] in _BOUNDS3D_STARTS and axis[1] in _BOUNDS3D_ENDS and
+                all(type(intrvl['bounds']) is Bounds3D
+                    for intrvl in self._intrvls)):
+            # Spanning Bounds3D only takes per-co-ordinate minima and maxima,
+            # so the runs are found on the columns alone and each merged
+            # bound is built once from the columns when its run is complete.
+            runs = []
+            for idx in order:
+                start = starts[idx]
+                end = ends[idx]
+                if runs and _overlaps_or_before(
+                        cur_start, cur_end, start, end, epsilon):
+                    runs[-1].append(idx)
+                    if start < cur_start:
+                        cur_start = start
+                    if end > cur_end:
+                        cur_end = end
+                else:
+                    runs.append([idx])
+                    cur_start = start
+                    cur_end = end
+            t1s, t2s, x1s, x2s, y1s, y2s = (
+                self._get_column(key) for key in _BOUNDS3D_KEYS)
+            for run in runs:
+                if len(run) == 1:
+                    new_coalesced_intrvls.append(self._intrvls[run[0]])
+                    continue
+                bounds = Bounds3D(
+                    min(t1s[i] for i in run), max(t2s[i] for i in run),
+                    min(x1s[i] for i in run), max(x2s[i] for i in run),
+                    min(y1s[i] for i in run), max(y2s[i] for i in run))
+                payload = self._intrvls[run[0]]['payload']
+                if payload_merge_op is not payload_first:
+                    for i in run[1:]:
+                        payload = payload_merge_op(
+                            payload, self._intrvls[i]['payload'])
+                new_coalesced_intrvls.append(Interval(bounds, payload))
+            return IntervalSet._from_unsorted(new_coalesced_intrvls)
+
+        if predicate is None or predicate is true_pred():
+            # Without a predicate, an interval can only be merged into the
+            # interval currently being built, so one pass over the sorted
+            # co-ordinates finds all the break points.
+            # The merged bounds and payload of the current run are kept apart
+            # and only wrapped in an Interval once the run ends.
+            # A run that is a single interval is emitted as that interval.
+            cur_intrvl = None
+            cur_bounds = None
+            for idx in order:
+                intrvl = self._intrvls[idx]
+                if cur_bounds is not None and _overlaps_or_before(
+                        cur_start, cur_end, starts[idx], ends[idx], epsilon):
+                    cur_intrvl = None
+                    cur_bounds = bounds_merge_op(cur_bounds, intrvl['bounds'])
+                    if payload_merge_op is not payload_first:
+                        cur_payload = payload_merge_op(cur_payload,
+                                                       intrvl['payload'])
+                    cur_start = cur_bounds[axis[0]]
+                    cur_end = cur_bounds[axis[1]]
+                else:
+                    if cur_intrvl is not None:
+                        new_coalesced_intrvls.append(cur_intrvl)
+                    elif cur_bounds is not None:
+                        new_coalesced_intrvls.append(
+                            Interval(cur_bounds, cur_payload))
+                    cur_intrvl = intrvl
+                    cur_bounds = intrvl['bounds']
+                    cur_payload = intrvl['payload']
+                    cur_start = starts[idx]
+                    cur_end = ends[idx]
+            if cur_intrvl is not None:
+                new_coalesced_intrvls.append(cur_intrvl)
+            else:
+                new_coalesced_intrvls.append(Interval(cur_bounds, cur_payload))
+            return IntervalSet._from_unsorted(new_coalesced_intrvls)
+
         #tracks all intervals that are currently experiencing merging
         current_intrvls = []
 
-        sorted_intervals = self._intrvls.copy()
-        sorted_intervals = sorted(sorted_intervals, key=lambda intrvl: (intrvl[axis[0]], intrvl[axis[1]]))
+        for idx in order:
+            intrvl = self._intrvls[idx]
+            start = starts[idx]
+            end = ends[idx]
 
-        for intrvl in sorted_intervals:
+            # One pass over current_intrvls both flushes the intervals that
+            # intrvl can no longer reach and finds the last one that it
+            # should be merged into.
             new_current_intrvls = []
+            loc = None
             for cur in current_intrvls:
-                if Bounds.cast({
-			        axis[0] : 't1',
-			        axis[1] : 't2'
-		        })(or_pred(overlaps(),
-                    before(max_dist=epsilon)))(cur, intrvl):
-                        #adds overlapping intervals to new_current_intrvls
-                        new_current_intrvls.append(cur)            
+                if _overlaps_or_before(cur[axis[0]], cur[axis[1]],
+                        start, end, epsilon):
+                    if predicate(cur, intrvl):
+                        loc = len(new_current_intrvls)
+                    new_current_intrvls.append(cur)
                 else:
-                    #adds all non-overlapping intervals to new_coalesced_intrvls
                     new_coalesced_intrvls.append(cur)
-
             current_intrvls = new_current_intrvls
-            matched_intrvl = None
-            loc = len(current_intrvls) - 1
-
-            #if current_intrvls is empty, we need to start constructing a new set of coalesced intervals
-            if len(current_intrvls) == 0:
-                current_intrvls.append(intrvl.copy())
-                continue
-            
-            if predicate is None:
-                matched_intrvl = current_intrvls[-1]
-            else:
-                for index, cur in enumerate(current_intrvls):
-                    if predicate(cur, intrvl):
-                        matched_intrvl = cur
-                        loc = index
 
             #if no matching interval is found, this implies that intrvl should be the start of a new coalescing interval
-            if matched_intrvl is None:
+            if loc is None:
                 current_intrvls.append(intrvl)
             else:
+                matched_intrvl = current_intrvls[loc]
                 current_intrvls[loc] = Interval(
                         bounds_merge_op(matched_intrvl['bounds'],
                                         intrvl['bounds']),
@@ -881,10 +1216,9 @@ class IntervalSet:
                                         intrvl['payload'])
                     )
 
-        for cur in current_intrvls:
-            new_coalesced_intrvls.append(cur)
+        new_coalesced_intrvls.extend(current_intrvls)
         
-        return IntervalSet(new_coalesced_intrvls)
+        return IntervalSet._from_unsorted(new_coalesced_intrvls)
 
     def to_json(self, payload_to_json):
         """Converts the interval set to a JSON object.
@@ -17,17 +17,24 @@ Intervals into one IntervalSet, or use the TV channel name as the domain key
 to re-group for downstream processing. IntervalSetMapping provides a convenient
 mechanism for dynamic re-grouping.
 """
+from collections import defaultdict
 from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from operator import attrgetter
-from types import MethodType
 from tqdm import tqdm
+import cloudpickle
 
 from rekall.interval import Interval
 from rekall.interval_set import IntervalSet
 from rekall.helpers import perf_count
 
+# Binary operations never modify their operands or return them, so the
+# operand for a key missing on one side can be a single shared empty set.
+# Lookups of missing keys get a fresh set, since callers may modify it.
+_EMPTY_SET = IntervalSet([])
+
 def _empty_set():
-    return IntervalSet([])
+    return IntervalSet._from_sorted([])
 
 class IntervalSetMapping(MutableMapping):
     """A wrapper around a dictionary from key to IntervalSet.
@@ -54,6 +61,13 @@ class IntervalSetMapping(MutableMapping):
     The methods to wrap from IntervalSet are defined by the class constants:
     UNARY_METHODS, BINARY_METHODS and OUT_OF_SYSTEM_UNARY_METHODS.
 
+    Each wrapped method also takes the keyword arguments ``profile`` and
+    ``progress_bar`` to print the wall time and show a tqdm progress bar, and
+    ``parallel`` to process the keys in a pool of worker processes. Set
+    ``parallel`` to True to use one worker per CPU, or to a number of
+    workers. The arguments to the method are serialized with cloudpickle, so
+    they may be lambdas.
+
     Example:
         Here are some examples of how IntervalSetMapping reflects IntervalSet's
         methods::
@@ -112,24 +126,27 @@ class IntervalSetMapping(MutableMapping):
     OUT_OF_SYSTEM_UNARY_METHODS = ["size", "duration", "empty", "fold", "match"]
 
     def __new__(cls, *args, **kwargs):
-        """Creates class instance and adds IntervalSet methods on it."""
-        instance = super(IntervalSetMapping, cls).__new__(cls)
+        """Adds IntervalSet methods on subclasses, which may override the
+        lists of methods to wrap, the first time they are instantiated."""
+        if '_wrapped_methods_added' not in vars(cls):
+            cls._add_wrapped_methods()
+        return super().__new__(cls)
+
+    @classmethod
+    def _add_wrapped_methods(cls):
+        """Adds IntervalSet methods on the class.
+
+        The wrappers are set once on the class rather than bound on every
+        instance, so creating an IntervalSetMapping is cheap.
+        """
+        cls._wrapped_methods_added = True
         for method in cls.UNARY_METHODS:
-            setattr(instance, method,
-                MethodType(
-                cls._get_wrapped_unary_method(method),
-                instance))
+            setattr(cls, method, cls._get_wrapped_unary_method(method))
         for method in cls.BINARY_METHODS:
-            setattr(instance, method,
-                MethodType(
-                cls._get_wrapped_binary_method(method),
-                instance))
+            setattr(cls, method, cls._get_wrapped_binary_method(method))
         for method in cls.OUT_OF_SYSTEM_UNARY_METHODS:
-            setattr(instance, method,
-                MethodType(
-                cls._get_wrapped_out_of_system_unary_method(method),
-                instance))
-        return instance
+            setattr(cls, method,
+                cls._get_wrapped_out_of_system_unary_method(method))
 
     def __init__(self, grouped_intervals):
         """Initializes with a dictionary from key to IntervalSet.
@@ -170,7 +187,8 @@ class IntervalSetMapping(MutableMapping):
 
     @classmethod
     def from_iterable(cls, iterable, key_parser, bounds_parser, 
-            payload_parser=lambda _:None, progress=False, total=None):
+            payload_parser=lambda _:None, progress=False, total=None,
+            add_key_to_payload=False):
         """Constructs an IntervalSetMapping from an iterable.
 
         Args:
@@ -188,6 +206,9 @@ class IntervalSetMapping(MutableMapping):
             total (int, optional): Total number of elements in iterable.
                 Only used to estimate ETA for the progress bar, and only takes 
                 effect if progress is True. 
+            add_key_to_payload (Bool, optional): Whether to set the payload
+                of each interval to the tuple ``(P, K)`` of its parsed payload
+                and key, as ``add_key_to_payload()`` does. Defaults to False.
 
         Returns:
             A IntervalSetMapping constructed from iterable and the parsers
@@ -196,21 +217,20 @@ class IntervalSetMapping(MutableMapping):
         Note:
             Everything in iterable will be materialized in RAM.
         """
-        key_to_intervals = {}
+        key_to_intervals = defaultdict(list)
         for row in (tqdm(iterable, total=total)
                 if progress and total is not None else tqdm(iterable)
                 if progress else iterable):
-            interval = Interval(bounds_parser(row), payload_parser(row))
             key = key_parser(row)
-            if key in key_to_intervals:
-                key_to_intervals[key].append(interval)
-            else:
-                key_to_intervals[key] = [interval]
+            payload = payload_parser(row)
+            if add_key_to_payload:
+                payload = (payload, key)
+            key_to_intervals[key].append(Interval(bounds_parser(row), payload))
         return cls({key: IntervalSet(intervals) for key, intervals in 
             key_to_intervals.items()})
 
     @classmethod
-    def from_intervalset(cls, intervalset, key_fn):
+    def from_intervalset(cls, intervalset, key_fn, add_key_to_payload=False):
         """Constructs an IntervalSetMapping from an IntervalSet by grouping
         by ``key_fn``.
         
@@ -219,20 +239,23 @@ class IntervalSetMapping(MutableMapping):
                 intervals to put in the mapping.
             key_fn: A function that takes an interval and returns the domain
                 key.
+            add_key_to_payload (Bool, optional): Whether to set the payload
+                of each interval to the tuple ``(P, K)`` of its payload and
+                key, as ``add_key_to_payload()`` does. Defaults to False.
 
         Returns:
             An IntervalSetMapping with the same intervals organized into
             domains by their key accroding to ``key_fn``.
         """
-        def reducer(acc, interval):
+        grouped = defaultdict(list)
+        for interval in intervalset.get_intervals():
             key = key_fn(interval)
-            if key not in acc:
-                acc[key] = [interval]
-            else:
-                acc[key].append(interval)
-            return acc
-        grouped = intervalset.fold(reducer, {})
-        return cls({k:IntervalSet(v) for k,v in grouped.items()})
+            if add_key_to_payload:
+                interval = Interval(interval['bounds'],
+                        (interval['payload'], key))
+            grouped[key].append(interval)
+        # Each group is a subsequence of the sorted intervals of intervalset.
+        return cls({k:IntervalSet._from_sorted(v) for k,v in grouped.items()})
 
     def get_grouped_intervals(self):
         """Get dictionary from key to IntervalSet."""
@@ -271,19 +294,55 @@ class IntervalSetMapping(MutableMapping):
                 new_map[key] = intervalset
         return new_map
 
+    @staticmethod
+    def _apply_to_keys(func, key_to_args, parallel=False, progress_bar=False):
+        """Applies func to the arguments for each key.
+
+        Args:
+            func: The function to apply.
+            key_to_args: A dictionary from key to a tuple of arguments.
+            parallel (optional): If True, or a number of worker processes,
+                the keys are processed in a pool of worker processes.
+                Defaults to False.
+            progress_bar (optional): Whether to display a progress bar using
+                tqdm. Defaults to False.
+
+        Returns:
+            A dictionary from key to the return value of func.
+        """
+        if not parallel:
+            keys = key_to_args.keys()
+            if progress_bar:
+                keys = tqdm(keys)
+            return {k: func(*key_to_args[k]) for k in keys}
+
+        # rekall.runtime imports this module, so import it here.
+        from rekall.runtime import _apply_serialized_function
+        num_workers = None if parallel is True else parallel
+        serialized_func = cloudpickle.dumps(func)
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = {k: executor.submit(
+                    _apply_serialized_function, serialized_func, *args)
+                    for k, args in key_to_args.items()}
+            if progress_bar:
+                for _ in tqdm(as_completed(futures.values()),
+                        total=len(futures)):
+                    pass
+            return {k: f.result() for k, f in futures.items()}
+
     @staticmethod
     def _get_wrapped_unary_method(name):
-        def method(self, *args, profile=False, progress_bar=False, **kwargs):
+        def method(self, *args, profile=False, progress_bar=False,
+                parallel=False, **kwargs):
             with perf_count(name, profile):
                 selfmap = self.get_grouped_intervals()
-                keys_to_process = selfmap.keys()
-                if progress_bar:
-                    keys_to_process = tqdm(keys_to_process)
 
                 def func(set1):
                     return getattr(IntervalSet, name)(set1,*args,**kwargs)
 
-                results_map = {v:func(selfmap[v]) for v in keys_to_process}
+                results_map = IntervalSetMapping._apply_to_keys(func,
+                        {v: (selfmap[v],) for v in selfmap.keys()},
+                        parallel, progress_bar)
             return IntervalSetMapping(
                     IntervalSetMapping._remove_empty_intervalsets(
                         results_map))
@@ -291,22 +350,22 @@ class IntervalSetMapping(MutableMapping):
 
     @staticmethod
     def _get_wrapped_binary_method(name):
-        def method(self, other, *args, profile=False, progress_bar=False, **kwargs):
+        def method(self, other, *args, profile=False, progress_bar=False,
+                parallel=False, **kwargs):
             with perf_count(name, profile):
                 selfmap = self.get_grouped_intervals()
                 othermap = other.get_grouped_intervals()
                 keys = set(selfmap.keys()).union(othermap.keys())
-                if progress_bar:
-                    keys = tqdm(keys)
 
                 def func(set1, set2):
                     return getattr(IntervalSet, name)(
                             set1,set2,*args,**kwargs)
 
-                results_map = {v:
-                        func(
-                            selfmap.get(v, IntervalSet([])),
-                            othermap.get(v, IntervalSet([]))) for v in keys}
+                results_map = IntervalSetMapping._apply_to_keys(func,
+                        {v: (selfmap.get(v, _EMPTY_SET),
+                             othermap.get(v, _EMPTY_SET))
+                         for v in keys},
+                        parallel, progress_bar)
             return IntervalSetMapping(
                     IntervalSetMapping._remove_empty_intervalsets(
                         results_map))
@@ -314,15 +373,17 @@ class IntervalSetMapping(MutableMapping):
 
     @staticmethod
     def _get_wrapped_out_of_system_unary_method(name):
-        def method(self, *args, profile=False, progress_bar=False, **kwargs):
+        def method(self, *args, profile=False, progress_bar=False,
+                parallel=False, **kwargs):
             with perf_count(name, profile):
                 selfmap = self.get_grouped_intervals()
-                keys = selfmap.keys()
-                if progress_bar:
-                    keys = tqdm(keys)
 
                 def func(set1):
                     return getattr(IntervalSet, name)(set1,*args,**kwargs)
-            return {v:func(selfmap[v]) for v in keys}
+
+                return IntervalSetMapping._apply_to_keys(func,
+                        {v: (selfmap[v],) for v in selfmap.keys()},
+                        parallel, progress_bar)
         return method
 
+IntervalSetMapping._add_wrapped_methods()
@@ -11,6 +11,10 @@ Example:
         bbox = { 'x1': 0.1, 'x2': 0.3, 'y1': 0.1, 'y2': 0.3 }
         pred = area_at_least(.03)
         bbox_satisfies_pred = pred(bbox)
+
+Predicates that take no arguments, such as ``overlaps()``, return the same
+function on every call. Building them inside a loop costs nothing, and code
+such as IntervalSet can recognize them by identity to use faster paths.
 """
 
 from rekall.helpers import INFTY
@@ -22,35 +26,99 @@ def not_pred(pred):
         return not pred(*args)
     return new_pred
 
-def and_pred(*preds):
-    """ANDs the predicates."""
+def _order_by_selectivity(preds, selectivity, reverse):
+    """Sorts predicates by their estimated pass rates."""
+    if selectivity is None:
+        return preds
+    if len(selectivity) != len(preds):
+        raise ValueError("Expected {} selectivity estimates, got {}".format(
+            len(preds), len(selectivity)))
+    return tuple(pred for _, pred in sorted(zip(selectivity, preds),
+        key=lambda p: p[0], reverse=reverse))
+
+def _flatten_preds(preds, attr, identity):
+    """Splices in the children of nested combinations built with the same
+    adapter and drops children that cannot change the result.
+
+    Flattening keeps the evaluation order, and saves a function call per
+    nesting level on every evaluation.
+    """
+    flat = []
+    for pred in preds:
+        if pred is identity:
+            continue
+        children = getattr(pred, attr, None)
+        if children is not None:
+            flat.extend(children)
+        else:
+            flat.append(pred)
+    return tuple(flat)
+
+def and_pred(*preds, selectivity=None):
+    """ANDs the predicates.
+
+    The predicates are evaluated in order and evaluation stops at the first
+    predicate that fails, so the most selective predicates should go first.
+
+    Args:
+        *preds: The predicates to AND.
+        selectivity (optional): A list with the estimated fraction of inputs
+            that pass each predicate. If given, the predicates are evaluated
+            from the lowest to the highest pass rate instead of in order.
+    """
+    preds = _order_by_selectivity(preds, selectivity, reverse=False)
+    preds = _flatten_preds(preds, '_and_preds', _true_pred)
+    if len(preds) == 0:
+        return true_pred()
+    if len(preds) == 1:
+        return preds[0]
     def new_pred(*args):
         for pred in preds:
             if not pred(*args):
                 return False
         return True
+    new_pred._and_preds = preds
     return new_pred
 
-def or_pred(*preds):
-    """ORs the predicates."""
+def or_pred(*preds, selectivity=None):
+    """ORs the predicates.
+
+    The predicates are evaluated in order and evaluation stops at the first
+    predicate that passes, so the least selective predicates should go first.
+
+    Args:
+        *preds: The predicates to OR.
+        selectivity (optional): A list with the estimated fraction of inputs
+            that pass each predicate. If given, the predicates are evaluated
+            from the highest to the lowest pass rate instead of in order.
+    """
+    preds = _order_by_selectivity(preds, selectivity, reverse=True)
+    preds = _flatten_preds(preds, '_or_preds', _false_pred)
+    if len(preds) == 0:
+        return false_pred()
+    if len(preds) == 1:
+        return preds[0]
     def new_pred(*args):
         for pred in preds:
             if pred(*args):
                 return True
         return False
+    new_pred._or_preds = preds
     return new_pred
 
 def true_pred():
     """Returns a predicate that always returns ``True``."""
-    def new_pred(*args):
-        return True
-    return new_pred
+    return _true_pred
+
+def _true_pred(*args):
+    return True
 
 def false_pred():
     """Returns a predicate that always returns ``False``."""
-    def new_pred(*args):
-        return False
-    return new_pred
+    return _false_pred
+
+def _false_pred(*args):
+    return False
 
 # Predicates on payloads.
 def payload_satisfies(pred):
@@ -156,10 +224,20 @@ def overlaps():
         An output function that takes two temporal intervals and returns
         ``True`` if the two intervals overlap in any way.
     """
-    return lambda intrvl1, intrvl2: ((intrvl1['t1'] < intrvl2['t1'] and intrvl1['t2'] > intrvl2['t1']) or
-            (intrvl1['t1'] < intrvl2['t2'] and intrvl1['t2'] > intrvl2['t2']) or
-            (intrvl1['t1'] <= intrvl2['t1'] and intrvl1['t2'] >= intrvl2['t2']) or
-            (intrvl1['t1'] >= intrvl2['t1'] and intrvl1['t2'] <= intrvl2['t2']))
+    return _overlaps
+
+def _overlaps(intrvl1, intrvl2):
+    return _ranges_overlap(intrvl1['t1'], intrvl1['t2'],
+                           intrvl2['t1'], intrvl2['t2'])
+
+def _ranges_overlap(a1, a2, b1, b2):
+    """Same as ``overlaps()`` on the ranges ``[a1, a2]`` and ``[b1, b2]``, but
+    takes the co-ordinates directly."""
+    # Either the two share more than an endpoint, or one contains the other
+    # (which covers intervals of length zero).
+    return ((a1 < b2 and b1 < a2) or
+            (a1 <= b1 and a2 >= b2) or
+            (a1 >= b1 and a2 <= b2))
 
 def overlaps_before():
     """Returns a function that computes whether a temporal interval has
@@ -175,7 +253,10 @@ def overlaps_before():
         ``True`` if the first interval starts before the second interval, and
         the two intervals have non-zero overlap.
     """
-    return lambda intrvl1, intrvl2: (intrvl1['t2'] > intrvl2['t1'] and intrvl1['t2'] < intrvl2['t2'] and
+    return _overlaps_before
+
+def _overlaps_before(intrvl1, intrvl2):
+    return (intrvl1['t2'] > intrvl2['t1'] and intrvl1['t2'] < intrvl2['t2'] and
             intrvl1['t1'] < intrvl2['t1'])
 
 def overlaps_after():
@@ -192,7 +273,10 @@ def overlaps_after():
         ``True`` if the first interval starts after the second interval, and
         the two intervals have non-zero overlap.
     """
-    return lambda intrvl1, intrvl2: (intrvl1['t1'] > intrvl2['t1'] and intrvl1['t1'] < intrvl2['t2'] and
+    return _overlaps_after
+
+def _overlaps_after(intrvl1, intrvl2):
+    return (intrvl1['t1'] > intrvl2['t1'] and intrvl1['t1'] < intrvl2['t2'] and
             intrvl1['t2'] > intrvl2['t2'])
 
 def starts(epsilon=0):
@@ -298,7 +382,10 @@ def during():
         ``True`` if the first interval takes place strictly during the second
         interval.
     """
-    return lambda intrvl1, intrvl2: intrvl1['t1'] > intrvl2['t1'] and intrvl1['t2'] < intrvl2['t2']
+    return _during
+
+def _during(intrvl1, intrvl2):
+    return intrvl1['t1'] > intrvl2['t1'] and intrvl1['t2'] < intrvl2['t2']
 
 def during_inv():
     """Returns a function that computes whether a temporal interval takes place
@@ -317,7 +404,10 @@ def during_inv():
         ``True`` if the second interval takes place strictly during the first
         interval.
     """
-    return lambda intrvl1, intrvl2: intrvl2['t1'] > intrvl1['t1'] and intrvl2['t2'] < intrvl1['t2']
+    return _during_inv
+
+def _during_inv(intrvl1, intrvl2):
+    return intrvl2['t1'] > intrvl1['t1'] and intrvl2['t2'] < intrvl1['t2']
 
 def meets_before(epsilon=0):
     """Returns a function that computes whether a temporal interval ends at the
@@ -374,7 +464,10 @@ def equal():
         ``True`` if the two intervals have equal start times and equal end
         times.
     """
-    return lambda intrvl1, intrvl2: intrvl1['t1'] == intrvl2['t1'] and intrvl1['t2'] == intrvl2['t2']
+    return _equal
+
+def _equal(intrvl1, intrvl2):
+    return intrvl1['t1'] == intrvl2['t1'] and intrvl1['t2'] == intrvl2['t2']
 
 # Unary bounding box predicates.
 def _area(bbox):
@@ -682,7 +775,10 @@ def left_of():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first bounding box is strictly to the left of the second one.
     """
-    return lambda bbox1, bbox2: bbox1['x2'] < bbox2['x1']
+    return _left_of
+
+def _left_of(bbox1, bbox2):
+    return bbox1['x2'] < bbox2['x1']
 
 def right_of():
     """Returns a function that takes two 2D bounding boxes and computes whether
@@ -696,7 +792,10 @@ def right_of():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first bounding box is strictly to the right of the second one.
     """
-    return lambda bbox1, bbox2: bbox1['x1'] > bbox2['x2']
+    return _right_of
+
+def _right_of(bbox1, bbox2):
+    return bbox1['x1'] > bbox2['x2']
 
 def above():
     """Returns a function that takes two 2D bounding boxes and computes whether
@@ -710,7 +809,10 @@ def above():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first bounding box is strictly above the second one.
     """
-    return lambda bbox1, bbox2: bbox1['y2'] < bbox2['y1']
+    return _above
+
+def _above(bbox1, bbox2):
+    return bbox1['y2'] < bbox2['y1']
 
 def below():
     """Returns a function that takes two 2D bounding boxes and computes whether
@@ -724,7 +826,10 @@ def below():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first bounding box is strictly below the second one.
     """
-    return lambda bbox1, bbox2: bbox1['y1'] > bbox2['y2']
+    return _below
+
+def _below(bbox1, bbox2):
+    return bbox1['y1'] > bbox2['y2']
 
 def same_area(epsilon=0.1):
     """Returns a function that takes two 2D bounding boxes and computes whether
@@ -755,7 +860,10 @@ def more_area():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first bounding box has strictly more area than the second one.
     """
-    return lambda bbox1, bbox2: _area(bbox1) > _area(bbox2)
+    return _more_area
+
+def _more_area(bbox1, bbox2):
+    return _area(bbox1) > _area(bbox2)
 
 def less_area():
     """Returns a function that takes two 2D bounding boxes and computes whether
@@ -769,7 +877,10 @@ def less_area():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first bounding box has strictly less area than the second one.
     """
-    return lambda bbox1, bbox2: _area(bbox1) < _area(bbox2)
+    return _less_area
+
+def _less_area(bbox1, bbox2):
+    return _area(bbox1) < _area(bbox2)
 
 def same_width(epsilon=0.1):
     """Returns a function that takes two 2D bounding boxes and computes whether
@@ -800,7 +911,10 @@ def more_width():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first bounding box is strictly wider than the second one.
     """
-    return lambda bbox1, bbox2: _width(bbox1) > _width(bbox2)
+    return _more_width
+
+def _more_width(bbox1, bbox2):
+    return _width(bbox1) > _width(bbox2)
 
 def less_width():
     """Returns a function that takes two 2D bounding boxes and computes whether
@@ -814,7 +928,10 @@ def less_width():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first bounding box is strictly narrower than the second one.
     """
-    return lambda bbox1, bbox2: _width(bbox1) < _width(bbox2)
+    return _less_width
+
+def _less_width(bbox1, bbox2):
+    return _width(bbox1) < _width(bbox2)
 
 def same_height(epsilon=0.1):
     """Returns a function that takes two 2D bounding boxes and computes whether
@@ -845,7 +962,10 @@ def more_height():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first bounding box is strictly taller than the second one.
     """
-    return lambda bbox1, bbox2: _height(bbox1) > _height(bbox2)
+    return _more_height
+
+def _more_height(bbox1, bbox2):
+    return _height(bbox1) > _height(bbox2)
 
 def less_height():
     """Returns a function that takes two 2D bounding boxes and computes whether
@@ -859,7 +979,10 @@ def less_height():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first bounding box is strictly shorter than the second one.
     """
-    return lambda bbox1, bbox2: _height(bbox1) < _height(bbox2)
+    return _less_height
+
+def _less_height(bbox1, bbox2):
+    return _height(bbox1) < _height(bbox2)
 
 def same_value(key, epsilon=0.1):
     """Returns a function that takes two dicts and computes whether
@@ -892,7 +1015,10 @@ def inside():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first one is inside the second one.
     """
-    return lambda bbox1, bbox2: (
+    return _inside
+
+def _inside(bbox1, bbox2):
+    return (
         bbox2['x1'] >= bbox1['x1'] and
         bbox2['x2'] <= bbox1['x2'] and
         bbox2['y1'] >= bbox1['y1'] and
@@ -910,7 +1036,10 @@ def contains():
         A function that takes two 2D bounding boxes and returns ``True`` if the
         first one contains the second one.
     """
-    return lambda bbox1, bbox2: inside()(bbox2, bbox1)
+    return _contains
+
+def _contains(bbox1, bbox2):
+    return _inside(bbox2, bbox1)
 
 def _iou(bbox1, bbox2):
     """Compute intersection over union of two bounding boxes."""
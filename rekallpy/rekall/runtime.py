@@ -245,9 +245,8 @@ class ForkedProcessPool(AbstractWorkerPool):
 # When spawning, arguments to initializer are pickled.
 # To allow arbitrary lambdas with closure, use cloudpickle to serialize the
 # function to execute
-def _apply_serialized_function(serialized_func, vids):
-    fn = cloudpickle.loads(serialized_func)
-    return fn(vids)
+def _apply_serialized_function(serialized_func, *args):
+    return cloudpickle.loads(serialized_func)(*args)
 
 class SpawnedProcessPool(AbstractWorkerPool):
     """A WorkerPool implementation using spawning.
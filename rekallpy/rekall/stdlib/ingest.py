@@ -175,7 +175,7 @@ def ism_from_iterable_with_schema_bounds3D(iterable, key_accessor,
 
 # from Django QS
 def ism_from_django_qs(qs, bounds_class=Bounds3D, bounds_schema={}, with_payload=None,
-        progress=None):
+        progress=None, add_key_to_payload=False):
     """Default constructor for Django QuerySets.
 
     This uses the right accessor for rows in a Django QuerySet and by default
@@ -216,6 +216,9 @@ def ism_from_django_qs(qs, bounds_class=Bounds3D, bounds_schema={}, with_payload
         progress (optional): Whether to display a loading bar from ``tqdm``.
             The total for the loading bar is computed using ``qs.count()``.
             Defaults to ``False``.
+        add_key_to_payload (optional): Whether to set the payload of each
+            Interval to the tuple ``(P, K)`` of its payload and key. Defaults
+            to ``False``.
 
     Returns:
         An IntervalSetMapping with Intervals from each record of qs.
@@ -224,40 +227,42 @@ def ism_from_django_qs(qs, bounds_class=Bounds3D, bounds_schema={}, with_payload
         NotImplementedError: If ``bounds_class`` is not one of ``Bounds3D`` or
             ``Bounds1D``.
     """
-    def django_accessor(row, field):
-        fields = field.split('.')
-        output = row
-        for field in fields:
-            output = attrgetter_accessor(output, field)
-        return output
     final_schema = {
         "key": "video_id",
         "t1": "min_frame",
         "t2": "max_frame"
     }
     final_schema.update(bounds_schema)
-    total = None
-    if progress is not None:
-        total = qs.count()
-    def payload_parser(record):
-        if not with_payload is None:
-            return with_payload(record)
-        else:
-            if "payload" in final_schema:
-                return django_accessor(record, final_schema["payload"])
-            else:
-                return None
     if bounds_class == Bounds3D:
-        return ism_from_iterable_with_schema_bounds3D(qs, django_accessor,
-            bounds_schema=final_schema, with_payload=payload_parser,
-            progress=progress, total=total)
+        coords = ['t1', 't2', 'x1', 'x2', 'y1', 'y2']
     elif bounds_class == Bounds1D:
-        return ism_from_iterable_with_schema_bounds1D(qs, django_accessor,
-            bounds_schema=final_schema, with_payload=payload_parser,
-            progress=progress, total=total)
+        coords = ['t1', 't2']
     else:
         raise NotImplementedError("{} not a supported bounds".format(
             bounds_class.__name__))
+    total = None
+    if progress is not None:
+        total = qs.count()
+
+    # attrgetter resolves nested field names and fetches all co-ordinates of
+    # a record in a single call.
+    fields = [c for c in coords if c in final_schema]
+    get_coords = attrgetter(*[final_schema[c] for c in fields])
+    if fields == coords[:len(fields)]:
+        def bounds_parser(record):
+            return bounds_class(*get_coords(record))
+    else:
+        def bounds_parser(record):
+            return bounds_class(**dict(zip(fields, get_coords(record))))
+    if with_payload is not None:
+        payload_parser = with_payload
+    elif "payload" in final_schema:
+        payload_parser = attrgetter(final_schema["payload"])
+    else:
+        payload_parser = lambda record: None
+    return IntervalSetMapping.from_iterable(qs,
+        attrgetter(final_schema["key"]), bounds_parser, payload_parser,
+        progress, total, add_key_to_payload)
 
 # from Pandas DF
 def ism_from_df(df, bounds_class=Bounds3D, bounds_schema={}, progress=None,
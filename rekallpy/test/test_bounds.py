@@ -1,4 +1,6 @@
 from rekall.bounds import *
+import json
+import pickle
 import unittest
 
 class TestBounds(unittest.TestCase):
@@ -11,6 +13,54 @@ class TestBounds(unittest.TestCase):
         bounds3d = Bounds3D(0, 1)
         bounds3d = Bounds3D.fromTuple((0, 1))
 
+    def test_bounds3d_item_access(self):
+        b = Bounds3D(0, 1, 0.5, 0.6)
+        self.assertEqual(b['x1'], 0.5)
+        b['x1'] = 0.2
+        self.assertEqual(b.data, {'t1': 0, 't2': 1, 'x1': 0.2, 'x2': 0.6,
+            'y1': 0., 'y2': 1.})
+        with self.assertRaises(KeyError):
+            b['z1']
+        with self.assertRaises(KeyError):
+            b['z1'] = 0
+        with self.assertRaises(KeyError):
+            b['copy']
+        with self.assertRaises(KeyError):
+            b['copy'] = 0
+        with self.assertRaises(TypeError):
+            b.data['t1'] = 5
+        self.assertEqual(b['t1'], 0)
+        self.assertEqual(json.loads(json.dumps(b.to_json())), b.data)
+        self.assertEqual(pickle.loads(pickle.dumps(b)).data, b.data)
+
+    def test_unpickle_legacy_bounds3d(self):
+        # Bounds3D(1, 2, 3, 4, 5, 6) pickled by rekall 0.3.2
+        legacy = (b'\x80\x02crekall.bounds.bounds3D\nBounds3D\nq\x00)\x81q\x01}'
+            b'q\x02X\x04\x00\x00\x00dataq\x03}q\x04(X\x02\x00\x00\x00t1q\x05'
+            b'K\x01X\x02\x00\x00\x00t2q\x06K\x02X\x02\x00\x00\x00x1q\x07K\x03'
+            b'X\x02\x00\x00\x00x2q\x08K\x04X\x02\x00\x00\x00y1q\tK\x05X\x02'
+            b'\x00\x00\x00y2q\nK\x06usb.')
+        self.assertEqual(pickle.loads(legacy).data,
+                Bounds3D(1, 2, 3, 4, 5, 6).data)
+
+    def test_unpickle_legacy_bounds1d(self):
+        # Bounds1D(1, 2) pickled by rekall 0.3.2
+        legacy = (b'\x80\x02crekall.bounds.bounds1D\nBounds1D\nq\x00)\x81q\x01}'
+            b'q\x02X\x04\x00\x00\x00dataq\x03}q\x04(X\x02\x00\x00\x00t1q\x05'
+            b'K\x01X\x02\x00\x00\x00t2q\x06K\x02usb.')
+        self.assertEqual(pickle.loads(legacy).data, Bounds1D(1, 2).data)
+        b = Bounds1D(3, 4)
+        self.assertEqual(pickle.loads(pickle.dumps(b)).data, b.data)
+
+    def test_sort_key_matches_lt(self):
+        for cls, values in [(Bounds1D, [(0, 1), (0, 2), (1, 1), (0, 1)]),
+                (Bounds3D, [(0, 1, 0.5, 1), (0, 1, 0.2, 1), (0, 1),
+                    (-1, 3, 0, 1, 0.5, 0.6)])]:
+            bounds = [cls.fromTuple(v) for v in values]
+            for b1 in bounds:
+                for b2 in bounds:
+                    self.assertEqual(b1 < b2, b1.sort_key() < b2.sort_key())
+
     def test_bounds1d_lt(self):
         self.assertTrue(Bounds1D(0, 1) < Bounds1D(0, 2))
         self.assertTrue(Bounds1D(0, 1) < Bounds1D(1, 1))
@@ -52,6 +102,21 @@ class TestBounds(unittest.TestCase):
         self.assertFalse(Bounds3D.X(example_pred)(higher_t2_lower_x2))
         self.assertFalse(Bounds3D.Y(example_pred)(higher_t2_lower_x2))
 
+    def test_bounds3d_overlaps_casts_match_generic_cast(self):
+        from rekall.predicates import overlaps
+        import itertools
+        coords = [0., 0.25, 0.5, 1.]
+        ranges = [(a, b) for a, b in itertools.product(coords, coords)
+                if a <= b]
+        for (a1, a2), (b1, b2) in itertools.product(ranges, ranges):
+            bounds1 = Bounds3D(0, 1, a1, a2, b1, b2)
+            bounds2 = Bounds3D(0, 1, b1, b2, a1, a2)
+            for cast, schema in [(Bounds3D.X, {'t1': 'x1', 't2': 'x2'}),
+                    (Bounds3D.Y, {'t1': 'y1', 't2': 'y2'})]:
+                self.assertEqual(cast(overlaps())(bounds1, bounds2),
+                        Bounds.cast(schema)(overlaps())(bounds1, bounds2))
+        self.assertIs(Bounds3D.XY(overlaps()), overlaps())
+
     def test_bounds_inheritance(self):
         from rekall.predicates import overlaps
 
@@ -0,0 +1,76 @@
+from rekall.index import IntervalTree, sweep_overlaps
+import random
+import unittest
+
+class TestIntervalTree(unittest.TestCase):
+    @staticmethod
+    def brute_force_query(intervals, lo, hi):
+        return [i for i, (start, end) in enumerate(intervals)
+                if start <= hi and end >= lo]
+
+    def test_empty(self):
+        tree = IntervalTree([], [])
+        self.assertEqual(len(tree), 0)
+        self.assertListEqual(tree.query(0, 10), [])
+
+    def test_query(self):
+        tree = IntervalTree([0, 2, 5], [1, 6, 7])
+        self.assertListEqual(tree.query(5.5, 10), [1, 2])
+        self.assertListEqual(tree.query(1, 1), [0])
+        self.assertListEqual(tree.query(1.5, 1.9), [])
+        self.assertListEqual(tree.query(-1, 10), [0, 1, 2])
+
+    def test_query_random(self):
+        rand = random.Random(0)
+        for n in [1, 2, 7, 16, 33, 100, 257]:
+            intervals = sorted([
+                (s, s + rand.choice([0, rand.randint(0, 20), 50]))
+                for s in [rand.randint(0, 100) for _ in range(n)]])
+            tree = IntervalTree([s for s, _ in intervals],
+                    [e for _, e in intervals])
+            for _ in range(50):
+                lo = rand.uniform(-5, 160)
+                hi = lo + rand.choice([0, rand.uniform(0, 30)])
+                self.assertListEqual(tree.query(lo, hi),
+                        TestIntervalTree.brute_force_query(
+                            intervals, lo, hi))
+
+class TestSweepOverlaps(unittest.TestCase):
+    def test_sweep(self):
+        matches = list(sweep_overlaps([0, 1, 5], [1, 4, 5],
+            [0, 2, 5], [1, 6, 7]))
+        self.assertListEqual(matches, [[0], [0, 1], [1, 2]])
+
+    def test_sweep_window(self):
+        matches = list(sweep_overlaps([3], [3], [0, 2, 5], [1, 2, 7],
+            window=1))
+        self.assertListEqual(matches, [[1]])
+
+    def test_sweep_inverted_intervals(self):
+        # Eroded intervals can end before they start.
+        matches = list(sweep_overlaps([0, 5], [8, 7], [4, 6], [9, 4]))
+        self.assertListEqual(matches, [[0, 1], [0]])
+        matches = list(sweep_overlaps([5], [3], [0, 4], [6, 9]))
+        self.assertListEqual(matches, [[0]])
+        matches = list(sweep_overlaps([5], [3], [0], [4]))
+        self.assertListEqual(matches, [[]])
+
+    def test_sweep_random(self):
+        rand = random.Random(0)
+        def random_intervals(n):
+            return sorted([
+                (s, s + rand.choice([0, rand.randint(0, 20), 50]))
+                for s in [rand.randint(0, 100) for _ in range(n)]])
+        for n, m in [(0, 5), (5, 0), (1, 1), (10, 100), (100, 10),
+                (100, 100)]:
+            queries = random_intervals(n)
+            intervals = random_intervals(m)
+            window = rand.choice([0, 3])
+            matches = list(sweep_overlaps(
+                [s for s, _ in queries], [e for _, e in queries],
+                [s for s, _ in intervals], [e for _, e in intervals],
+                window))
+            self.assertListEqual(matches, [
+                TestIntervalTree.brute_force_query(
+                    intervals, lo - window, hi + window)
+                for lo, hi in queries])
@@ -0,0 +1,64 @@
+from rekall.bounds import Bounds1D, Bounds3D
+from rekall.stdlib.ingest import ism_from_django_qs
+from types import SimpleNamespace
+import unittest
+
+class FakeQuerySet(list):
+    def count(self):
+        return len(self)
+
+class TestIngest(unittest.TestCase):
+    @staticmethod
+    def get_qs():
+        return FakeQuerySet([
+            SimpleNamespace(id=1, video_id=1, min_frame=0, max_frame=10,
+                x1=0.1, x2=0.4, y1=0.2, y2=0.3,
+                face=SimpleNamespace(frame=SimpleNamespace(number=5))),
+            SimpleNamespace(id=2, video_id=2, min_frame=3, max_frame=4,
+                x1=0.5, x2=0.6, y1=0.7, y2=0.8,
+                face=SimpleNamespace(frame=SimpleNamespace(number=7))),
+        ])
+
+    def assertIsmEqual(self, ism, expected):
+        self.assertEqual(
+            {k: [(i['bounds'].data, i['payload'])
+                for i in ism[k].get_intervals()] for k in ism.keys()},
+            expected)
+
+    def test_default_schema(self):
+        self.assertIsmEqual(ism_from_django_qs(self.get_qs(), progress=True), {
+            1: [(Bounds3D(0, 10).data, None)],
+            2: [(Bounds3D(3, 4).data, None)]})
+
+    def test_full_schema_with_payload(self):
+        ism = ism_from_django_qs(self.get_qs(), bounds_schema={
+            'x1': 'x1', 'x2': 'x2', 'y1': 'y1', 'y2': 'y2', 'payload': 'id'})
+        self.assertIsmEqual(ism, {
+            1: [(Bounds3D(0, 10, 0.1, 0.4, 0.2, 0.3).data, 1)],
+            2: [(Bounds3D(3, 4, 0.5, 0.6, 0.7, 0.8).data, 2)]})
+
+    def test_partial_schema(self):
+        ism = ism_from_django_qs(self.get_qs(),
+                bounds_schema={'y1': 'y1', 'y2': 'y2'})
+        self.assertIsmEqual(ism, {
+            1: [(Bounds3D(0, 10, y1=0.2, y2=0.3).data, None)],
+            2: [(Bounds3D(3, 4, y1=0.7, y2=0.8).data, None)]})
+
+    def test_nested_fields(self):
+        ism = ism_from_django_qs(self.get_qs(), bounds_schema={
+            't1': 'face.frame.number', 't2': 'face.frame.number'},
+            add_key_to_payload=True)
+        self.assertIsmEqual(ism, {
+            1: [(Bounds3D(5, 5).data, (None, 1))],
+            2: [(Bounds3D(7, 7).data, (None, 2))]})
+
+    def test_bounds1d(self):
+        ism = ism_from_django_qs(self.get_qs(), bounds_class=Bounds1D,
+                bounds_schema={'payload': 'id'})
+        self.assertIsmEqual(ism, {
+            1: [(Bounds1D(0, 10).data, 1)],
+            2: [(Bounds1D(3, 4).data, 2)]})
+
+    def test_unsupported_bounds(self):
+        with self.assertRaises(NotImplementedError):
+            ism_from_django_qs(self.get_qs(), bounds_class=dict)
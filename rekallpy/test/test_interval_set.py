@@ -1,8 +1,9 @@
 from rekall.predicates import *
 from rekall import Interval, IntervalSet
-from rekall.bounds import Bounds3D
+from rekall.bounds import Bounds1D, Bounds3D
 from rekall.stdlib.merge_ops import *
 from operator import eq
+import pickle
 import unittest
 
 class TestIntervalSet(unittest.TestCase):
@@ -84,6 +85,50 @@ class TestIntervalSet(unittest.TestCase):
             ])
         self.assertIntervalSetEq(is3, target, eq)
 
+    def test_fast_paths_match_generic_predicate(self):
+        # join and filter_against special-case these predicates, so compare
+        # them against the same predicates wrapped in a plain function.
+        is1 = IntervalSet([
+            Interval(Bounds3D(t, t + d), (t, d))
+            for t in range(10) for d in [0, 1, 3]])
+        is2 = IntervalSet([
+            Interval(Bounds3D(t / 2, t / 2 + d), (t, d))
+            for t in range(20) for d in [0, 2]])
+        small = IntervalSet([
+            Interval(Bounds3D(t * 7, t * 7 + 2), t) for t in range(3)])
+        large = IntervalSet([
+            Interval(Bounds3D(t, t + 1), t) for t in range(0, 200, 3)])
+        merge = lambda i1, i2: Interval(i1['bounds'].span(i2['bounds']),
+                (i1['payload'], i2['payload']))
+        for left, right in [(is1, is2), (is2, is1), (small, large),
+                (large, small)]:
+            for predicate in [overlaps(), Bounds3D.T(overlaps()), true_pred()]:
+                generic = lambda i1, i2: predicate(i1, i2)
+                for window in [None, 0, 1]:
+                    with self.subTest(predicate=predicate, window=window):
+                        self.assertIntervalSetEq(
+                            left.join(right, predicate, merge, window),
+                            left.join(right, generic, merge, window), eq)
+                        self.assertIntervalSetEq(
+                            left.filter_against(right, predicate, window),
+                            left.filter_against(right, generic, window), eq)
+
+    def test_binary_operations_with_eroded_set(self):
+        is1 = IntervalSet([Interval(Bounds3D(5, 7), 'a')])
+        # Dilating by a negative window can invert intervals: this is [6, 4].
+        is2 = IntervalSet([Interval(Bounds3D(4, 6), 'b')]).dilate(-2)
+        merge = lambda i1, i2: i1
+        self.assertTrue(is1.join(is2, true_pred(), merge, window=0).empty())
+        self.assertTrue(is1.join(is2, lambda i1, i2: True, merge,
+            window=0).empty())
+        self.assertTrue(is1.filter_against(is2, lambda i1, i2: True,
+            window=0).empty())
+        self.assertTrue(is1.filter_against(is2, true_pred(),
+            window=0).empty())
+        collected = is1.collect_by_interval(is2, lambda i1, i2: True,
+            filter_empty=False, window=0)
+        self.assertTrue(collected.get_intervals()[0]['payload'][1].empty())
+
     def test_join_with_optimization_window(self):
         is1 = IntervalSet([
             Interval(Bounds3D(t,t+1), t) for t in range(100)
@@ -399,6 +444,54 @@ class TestIntervalSet(unittest.TestCase):
             ])
         self.assertIntervalSetEq(is3, target)
 
+    def test_pickle(self):
+        is1 = IntervalSet([
+            Interval(Bounds3D(1,2,0.5,0.9,0.1,0.2), {'a': 1}),
+            Interval(Bounds3D(20,30,0.4,1.0, 0,1), None),
+            ])
+        self.assertIntervalSetEq(pickle.loads(pickle.dumps(is1)), is1)
+        # Cached columns and index are not pickled
+        size = len(pickle.dumps(is1))
+        is1.join(is1, overlaps(), lambda i1, i2: i1)
+        self.assertEqual(len(pickle.dumps(is1)), size)
+
+    def test_unpickle_legacy_interval(self):
+        # Interval(Bounds3D(1, 2), 'p') pickled by rekall 0.3.2
+        legacy = (b'\x80\x02crekall.interval\nInterval\nq\x00)\x81q\x01}q\x02('
+            b'X\x06\x00\x00\x00boundsq\x03crekall.bounds.bounds3D\nBounds3D\n'
+            b'q\x04)\x81q\x05}q\x06X\x04\x00\x00\x00dataq\x07}q\x08(X\x02\x00'
+            b'\x00\x00t1q\tK\x01X\x02\x00\x00\x00t2q\nK\x02X\x02\x00\x00\x00'
+            b'x1q\x0bG\x00\x00\x00\x00\x00\x00\x00\x00X\x02\x00\x00\x00x2q\x0c'
+            b'G?\xf0\x00\x00\x00\x00\x00\x00X\x02\x00\x00\x00y1q\rG\x00\x00\x00'
+            b'\x00\x00\x00\x00\x00X\x02\x00\x00\x00y2q\x0eG?\xf0\x00\x00\x00'
+            b'\x00\x00\x00usbX\x07\x00\x00\x00payloadq\x0fX\x01\x00\x00\x00pq'
+            b'\x10ub.')
+        self.assertIntervalsEq(pickle.loads(legacy),
+                Interval(Bounds3D(1, 2), 'p'))
+
+    def test_unpickle_legacy_interval_set(self):
+        # IntervalSet([Interval(Bounds1D(1, 2), 'a')]) pickled by rekall 0.3.2
+        legacy = (b'\x80\x02crekall.interval_set\nIntervalSet\nq\x00)\x81q\x01}q'
+            b'\x02(X\x08\x00\x00\x00_intrvlsq\x03]q\x04crekall.interval\nInt'
+            b'erval\nq\x05)\x81q\x06}q\x07(X\x06\x00\x00\x00boundsq\x08creka'
+            b'll.bounds.bounds1D\nBounds1D\nq\t)\x81q\n}q\x0bX\x04\x00\x00'
+            b'\x00dataq\x0c}q\r(X\x02\x00\x00\x00t1q\x0eK\x01X\x02\x00\x00'
+            b'\x00t2q\x0fK\x02usbX\x07\x00\x00\x00payloadq\x10X\x01\x00\x00'
+            b'\x00aq\x11ubaX\r\x00\x00\x00_primary_axisq\x12h\x0eh\x0f\x86q'
+            b'\x13X\x14\x00\x00\x00_optimization_windowq\x14K\x01ub.')
+        is1 = pickle.loads(legacy)
+        self.assertIntervalSetEq(is1,
+                IntervalSet([Interval(Bounds1D(1, 2), 'a')]))
+        self.assertEqual(is1.coalesce(('t1', 't2'), Bounds1D.span).size(), 1)
+
+    def test_identity_operations_return_self(self):
+        is1 = IntervalSet([
+            Interval(Bounds3D(1,2,0.5,0.9,0.1,0.2)),
+            Interval(Bounds3D(20,30,0.4,1.0, 0,1)),
+            ])
+        self.assertIs(is1.dilate(0), is1)
+        self.assertIs(is1.filter(true_pred()), is1)
+
     def test_filter_size(self):
         is1 = IntervalSet([
             Interval(Bounds3D(1,2,0.5,0.9,0.1,0.2)),
@@ -417,6 +510,24 @@ class TestIntervalSet(unittest.TestCase):
         self.assertIntervalSetEq(is3, IntervalSet([
             Interval(Bounds3D(1,2,0.5,0.9,0.1,0.2))]))
 
+    def test_derived_sets_keep_columns(self):
+        is1 = IntervalSet([
+            Interval(Bounds3D(1,2,0.5,0.9,0.1,0.2), 1),
+            Interval(Bounds3D(20,30,0.4,1.0, 0,1), 2),
+            Interval(Bounds3D(50,55,0.2,0.3, 0.5,0.9), 3),
+            ])
+        self.assertEqual(is1.duration(), 16)
+        derived = [
+            is1.filter_size(min_size=5),
+            is1.dilate(2),
+            is1.dilate(0.1, axis=('x1', 'x2')),
+            is1.map_payload(lambda p: p + 1),
+        ]
+        for iset in derived:
+            for key in ['t1', 't2']:
+                self.assertListEqual(iset._get_column(key),
+                        [intrvl[key] for intrvl in iset.get_intervals()])
+
     def test_group_by_axis(self):
         default_bounds = Bounds3D(0, 1, 0, 1, 0, 1)
         intervals_1 = [
@@ -492,7 +603,22 @@ class TestIntervalSet(unittest.TestCase):
         self.assertIntervalSetEq(is1.coalesce(('t1', 't2'), Bounds3D.span,
             payload_plus,epsilon=2),
             IntervalSet([Interval(Bounds3D(1,23),payload=8)]))
-    
+
+    def test_coalesce_spatial_axis(self):
+        is1 = IntervalSet([
+            Interval(Bounds3D(0,1,0.1,0.3,0,1),1),
+            Interval(Bounds3D(5,6,0.2,0.4,0,1),1),
+            Interval(Bounds3D(0,1,0.6,0.8,0,1),1),
+            ])
+        target = IntervalSet([
+            Interval(Bounds3D(0,6,0.1,0.4,0,1),2),
+            Interval(Bounds3D(0,1,0.6,0.8,0,1),1),
+            ])
+        self.assertIntervalSetEq(is1.coalesce(('x1', 'x2'), Bounds3D.span,
+            payload_plus), target)
+        self.assertIntervalSetEq(is1.coalesce(('x1', 'x2'), Bounds3D.span,
+            payload_plus, predicate=true_pred()), target)
+
     def test_coalesce_with_pred(self):
         def overlapping_bboxes(intrvl1, intrvl2):
             if Bounds3D.X(overlaps())(intrvl1, intrvl2) and Bounds3D.Y(overlaps())(intrvl1, intrvl2):
@@ -85,3 +85,43 @@ class TestIntervalSetMapping(unittest.TestCase):
         keys = list(k for k in c)
         self.assertEqual(keys, sorted(list(c.get_grouped_intervals().keys())))
 
+
+    def test_missing_key_returns_fresh_empty_set(self):
+        c = IntervalSetMapping({})
+        c[1].get_intervals().append(Interval(Bounds3D(0, 1)))
+        self.assertTrue(c[1].empty())
+        self.assertIsNot(c[1], c[2])
+
+    def test_subclass_wraps_own_methods(self):
+        class SizeOnlyMapping(IntervalSetMapping):
+            UNARY_METHODS = []
+            BINARY_METHODS = []
+            OUT_OF_SYSTEM_UNARY_METHODS = ["size"]
+        c = SizeOnlyMapping(
+                TestIntervalSetMapping.get_collection().get_grouped_intervals())
+        self.assertEqual(c.size(), {v: 150 for v in c.keys()})
+        self.assertNotIn("size", vars(c))
+
+    def test_parallel(self):
+        c = TestIntervalSetMapping.get_collection()
+        c1 = IntervalSetMapping({v: c[v] for v in c if v % 2 ==0})
+        self.assertCollectionEq(
+                c.minus(c1, window=0, parallel=2),
+                c.minus(c1, window=0))
+        self.assertCollectionEq(
+                c.filter(lambda i: i['t1'] % 3 == 0, parallel=2),
+                c.filter(lambda i: i['t1'] % 3 == 0))
+        self.assertEqual(c.size(parallel=2), c.size())
+
+    def test_add_key_to_payload_on_construction(self):
+        c = TestIntervalSetMapping.get_collection()
+        flattened = c.get_flattened_intervalset()
+        target = IntervalSetMapping.from_intervalset(flattened,
+                lambda i: i['payload']).add_key_to_payload()
+        self.assertCollectionEq(IntervalSetMapping.from_intervalset(
+            flattened, lambda i: i['payload'], add_key_to_payload=True),
+            target)
+        self.assertCollectionEq(IntervalSetMapping.from_iterable(
+            flattened.get_intervals(), lambda i: i['payload'],
+            lambda i: i['bounds'], lambda i: i['payload'],
+            add_key_to_payload=True), target)
@@ -3,6 +3,17 @@ from rekall.bounds import Bounds1D
 import unittest
 
 class TestLogicalPredicates(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def logged(self, name, result):
+        """Returns a predicate that records ``name`` in ``self.calls`` when
+        evaluated and returns ``result``."""
+        def pred(*args):
+            self.calls.append(name)
+            return result
+        return pred
+
     def test_true_pred(self):
         bounds1 = Bounds1D(1, 2)
         bounds2 = Bounds1D(5, 6)
@@ -30,6 +41,37 @@ class TestLogicalPredicates(unittest.TestCase):
         self.assertTrue(or_pred(overlaps_before(), overlaps())(bounds1, bounds2))
         self.assertTrue(or_pred(overlaps_before(), before())(bounds1, bounds2))
 
+    def test_selectivity_order(self):
+        and_pred(self.logged('a', True), self.logged('b', False),
+                selectivity=[0.9, 0.1])()
+        self.assertListEqual(self.calls, ['b'])
+
+        self.calls.clear()
+        or_pred(self.logged('a', False), self.logged('b', True),
+                selectivity=[0.1, 0.9])()
+        self.assertListEqual(self.calls, ['b'])
+
+        with self.assertRaises(ValueError):
+            and_pred(true_pred(), false_pred(), selectivity=[0.5])
+
+    def test_nested_combinations_flatten(self):
+        pred = and_pred(
+                and_pred(self.logged('a', True), self.logged('b', True)),
+                true_pred(), self.logged('c', False))
+        self.assertFalse(pred())
+        self.assertListEqual(self.calls, ['a', 'b', 'c'])
+        self.assertEqual(len(pred._and_preds), 3)
+
+        self.calls.clear()
+        pred = or_pred(false_pred(), or_pred(self.logged('a', False),
+            self.logged('b', True)))
+        self.assertTrue(pred())
+        self.assertListEqual(self.calls, ['a', 'b'])
+
+        self.assertIs(and_pred(overlaps(), true_pred()), overlaps())
+        self.assertIs(and_pred(), true_pred())
+        self.assertIs(or_pred(), false_pred())
+
     def test_not(self):
         bounds1 = Bounds1D(1., 3.)
         bounds2 = Bounds1D(2., 4.)
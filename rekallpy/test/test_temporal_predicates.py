@@ -82,6 +82,17 @@ class TestTemporalPredicates(unittest.TestCase):
 
         self.assertTrue(pred(bounds2, bounds2))
 
+        bounds13 = Bounds1D(3., 3.)
+        bounds14 = Bounds1D(4., 4.)
+        self.assertTrue(pred(bounds2, bounds13))
+        self.assertTrue(pred(bounds14, bounds2))
+        self.assertFalse(pred(bounds13, bounds14))
+
+    def test_stateless_predicates_are_shared(self):
+        for factory in [overlaps, overlaps_before, overlaps_after, during,
+                during_inv, equal]:
+            self.assertIs(factory(), factory())
+
     def test_overlapsbefore(self):
         pred = overlaps_before()
         bounds1 = Bounds1D(1., 3.)